@@ -1,5 +1,21 @@
+import argparse
 import os
 import shutil
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+
+MOVE_WORKERS = 16  # moves are I/O bound, so more threads than CPUs pays off on network shares
+BATCH_SIZE = 500  # files per move task
+PAGE_SIZE = 100_000  # files listed per directory scan, before any of them is moved
+PROGRESS_EVERY = 10_000  # files between progress lines
+
+
+def folder_for(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    return ext[1:].upper() if ext else "NO_EXTENSION"
 
 
 def organize_files(directory):
@@ -17,8 +33,7 @@ def organize_files(directory):
         if os.path.isdir(filepath) or filename.startswith("."):
             continue
 
-        ext = os.path.splitext(filename)[1].lower()
-        folder_name = ext[1:].upper() if ext else "NO_EXTENSION"
+        folder_name = folder_for(filename)
 
         target_dir = os.path.join(directory, folder_name)
         os.makedirs(target_dir, exist_ok=True)
@@ -30,25 +45,155 @@ def organize_files(directory):
     print(f"\nDone! {moved} file(s) organized.")
 
 
+def _move_batch(batch):
+    """Move (source, target) pairs, returning the number moved and the failures."""
+    moved = 0
+    failed = []
+    for source, target in batch:
+        try:
+            os.rename(source, target)
+        except OSError:
+            try:
+                shutil.move(source, target)  # e.g. an existing target on Windows
+            except OSError as e:
+                failed.append((source, e))
+                continue
+        moved += 1
+    return moved, failed
+
+
+def _scan_page(directory, limit, skip):
+    """
+    Names of up to `limit` files to move, skipping directories, hidden files
+    and the names in `skip`. The scan is finished before anything is moved.
+    """
+    page = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # Skip directories and hidden files
+            if entry.name.startswith(".") or entry.name in skip or entry.is_dir():
+                continue
+            page.append(entry.name)
+            if len(page) == limit:
+                break
+    return page
+
+
+def organize_files_fast(directory, workers=MOVE_WORKERS, batch_size=BATCH_SIZE,
+                        progress_every=PROGRESS_EVERY, page_size=PAGE_SIZE):
+    """
+    organize_files() for very large directories. Files are listed with
+    os.scandir(), whose cached file types avoid a stat per file, each
+    folder is created once, and the moves run in batches on a pool of
+    `workers` threads with a progress line every `progress_every` files.
+
+    Removing entries while a directory is being read can make readdir skip
+    or repeat some (notably on NFS), so the directory is listed in pages of
+    `page_size` files, each scan closed before its files are moved, and
+    scanned again until nothing is left to move.
+    """
+    if not os.path.isdir(directory):
+        print(f"Error: '{directory}' is not a valid directory.")
+        return
+
+    created = set()
+    failed = set()  # names not moved, skipped by later scans
+    moved = 0
+    reported = 0
+    pending = deque()  # at most 2 batches per worker, so memory stays bounded
+
+    def collect(future):
+        nonlocal moved, reported
+        count, errors = future.result()
+        moved += count
+        for source, error in errors:
+            failed.add(os.path.basename(source))
+            print(f"  Failed: {os.path.basename(source)} ({error})")
+        if progress_every and moved - reported >= progress_every:
+            reported = moved
+            print(f"  {moved} file(s) moved...", flush=True)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while page := _scan_page(directory, page_size, failed):
+            batch = []
+            for name in page:
+                folder_name = folder_for(name)
+                target_dir = os.path.join(directory, folder_name)
+                if folder_name not in created:
+                    os.makedirs(target_dir, exist_ok=True)
+                    created.add(folder_name)
+
+                batch.append((os.path.join(directory, name), os.path.join(target_dir, name)))
+                if len(batch) == batch_size:
+                    pending.append(pool.submit(_move_batch, batch))
+                    batch = []
+                    if len(pending) >= 2 * workers:
+                        collect(pending.popleft())
+            if batch:
+                pending.append(pool.submit(_move_batch, batch))
+            # Every move of this page is done before the directory is read again
+            while pending:
+                collect(pending.popleft())
+
+    print(f"\nDone! {moved} file(s) organized into {len(created)} folder(s).")
+    if failed:
+        print(f"{len(failed)} file(s) could not be moved.")
+
+
+def benchmark(files, workers):
+    """Time organize_files() against organize_files_fast() on generated files."""
+    extensions = [".txt", ".jpg", ".PNG", ".pdf", ".csv", ".tar.gz", ".py", ""]
+    for name, organize in (("serial", organize_files),
+                           ("fast", lambda d: organize_files_fast(d, workers, progress_every=0))):
+        with tempfile.TemporaryDirectory() as directory:
+            for i in range(files):
+                open(os.path.join(directory, f"file{i}{extensions[i % len(extensions)]}"), "w").close()
+            start = time.perf_counter()
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                organize(directory)
+            seconds = time.perf_counter() - start
+        print(f"{name:8}{seconds:8.2f} s {files / seconds:10.0f} files/s")
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Sort files into subfolders by extension")
+    parser.add_argument("directory", nargs="?", help="Directory to organize (asked for when omitted)")
+    parser.add_argument("-j", "--jobs", type=int, default=MOVE_WORKERS,
+                        help=f"Threads moving files (default: {MOVE_WORKERS})")
+    parser.add_argument("--serial", action="store_true",
+                        help="Move files one at a time, printing each one")
+    parser.add_argument("-y", "--yes", action="store_true", help="Do not ask for confirmation")
+    parser.add_argument("--benchmark", type=int, metavar="FILES",
+                        help="Time serial and fast mode on this many generated files")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, args.jobs)
+        return
+
     print()
     print("#################################")
     print("|     Python File Organizer     |")
     print("#################################")
     print()
 
-    directory = input("Enter the directory path to organize: ").strip()
+    directory = args.directory or input("Enter the directory path to organize: ").strip()
 
     if not directory:
         print("No directory provided.")
         return
 
-    confirm = input(f"This will sort files in '{directory}' into subfolders by extension. Continue? (yes/no): ").strip()
+    if args.yes:
+        confirm = "yes"
+    else:
+        confirm = input(f"This will sort files in '{directory}' into subfolders by extension. Continue? (yes/no): ").strip()
 
-    if confirm.lower() == "yes":
+    if confirm.lower() != "yes":
+        print("Cancelled.")
+    elif args.serial:
         organize_files(directory)
     else:
-        print("Cancelled.")
+        organize_files_fast(directory, args.jobs)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,374 @@
+"""
+Benchmarks for converter.py.
+
+Usage:
+    python benchmark.py flatten [--rows N] [--input input.json]
+    python benchmark.py startup [--budget-ms MS] [--runs N]
+    python benchmark.py generate OUTPUT [--rows N] [--depth D] [--width W] [--sparsity S]
+    python benchmark.py suite [--rows N] [--label NAME] [--results-dir benchmarks]
+    python benchmark.py compare OLD.json NEW.json
+"""
+import argparse
+import datetime
+import importlib.util
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, List, Set, Tuple
+
+import converter
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_INPUT = os.path.join(HERE, 'input.json')
+
+
+def load_sample(path: str, rows: int) -> List[Dict[str, Any]]:
+    """Load the sample records and repeat them up to the requested row count."""
+    with open(path, 'r', encoding='utf-8') as f:
+        sample = json.load(f)
+    if not isinstance(sample, list):
+        sample = [sample]
+    return list(itertools.islice(itertools.cycle(sample), rows))
+
+
+def time_flatten(flatten: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 records: List[Dict[str, Any]]) -> float:
+    """Return the records/sec achieved by flatten over records."""
+    start = time.perf_counter()
+    for record in records:
+        flatten(record)
+    return len(records) / (time.perf_counter() - start)
+
+
+def bench_flatten(args: argparse.Namespace) -> int:
+    records = load_sample(args.input, args.rows)
+    compiled = converter.RecordFlattener()
+
+    # The compiled plans must produce exactly what flatten_json does
+    for record in records[:1000]:
+        if compiled(record) != converter.flatten_json(record):
+            print(f"Mismatch for record: {record}", file=sys.stderr)
+            return 1
+
+    print(f"Flattening {len(records):,} records from {os.path.basename(args.input)}")
+    baseline = time_flatten(converter.flatten_json, records)
+    print(f"  flatten_json:     {baseline:>12,.0f} records/sec")
+    fast = time_flatten(converter.RecordFlattener(), records)
+    print(f"  RecordFlattener:  {fast:>12,.0f} records/sec  ({fast / baseline:.1f}x)")
+    return 0
+
+
+# Modules the plain CSV conversion must never import
+CSV_PATH_FORBIDDEN = ('tqdm', 'pandas', 'openpyxl', 'pyarrow', 'concurrent.futures', 'multiprocessing')
+
+
+def measure_imports(args: List[str]) -> Tuple[float, Set[str]]:
+    """
+    Run python -X importtime with args and return (import ms, imported modules).
+    
+    The import time is the sum of the cumulative times of all top-level
+    imports, as reported on stderr.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + args,
+        cwd=HERE, capture_output=True, text=True, check=True,
+    )
+    total_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        modules.add(name.strip())
+        if not name[1:].startswith(' '):  # top-level import
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def bench_startup(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        command = ['converter.py', SAMPLE_INPUT, '-o', os.path.join(tmp, 'out.csv'), '--no-progress']
+        samples = []
+        for _ in range(args.runs):
+            bare_ms, _ = measure_imports(['-c', 'pass'])
+            csv_ms, modules = measure_imports(command)
+            samples.append(csv_ms - bare_ms)
+
+    import_ms = statistics.median(samples)
+    print(f"CSV path import time: {import_ms:.1f} ms over a bare interpreter "
+          f"(median of {args.runs}, budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    loaded = sorted(m for m in modules
+                    if any(m == f or m.startswith(f + '.') for f in CSV_PATH_FORBIDDEN))
+    if loaded:
+        print(f"  FAIL: heavy modules imported on the CSV path: {', '.join(loaded)}")
+        failed = True
+    if import_ms > args.budget_ms:
+        print(f"  FAIL: import time exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print("  OK")
+    return 1 if failed else 0
+
+
+DEPARTMENTS = ('Engineering', 'Marketing', 'Sales', 'Finance', 'Support', 'Operations')
+SKILLS = ('Python', 'JavaScript', 'SQL', 'SEO', 'Excel', 'Go', 'Rust', 'Negotiation', 'Design')
+CITIES = (('San Francisco', 'CA'), ('New York', 'NY'), ('Austin', 'TX'), ('Chicago', 'IL'), ('Seattle', 'WA'))
+FIRST_NAMES = ('John', 'Emily', 'Michael', 'Sarah', 'David', 'Anna', 'Luis', 'Mei')
+LAST_NAMES = ('Smith', 'Johnson', 'Chen', 'Brown', 'Garcia', 'Müller', 'Kowalski')
+
+
+def _random_date(rng: random.Random, start_year: int, end_year: int) -> str:
+    start = datetime.date(start_year, 1, 1).toordinal()
+    end = datetime.date(end_year, 12, 31).toordinal()
+    return datetime.date.fromordinal(rng.randint(start, end)).isoformat()
+
+
+def _nested_object(rng: random.Random, depth: int, width: int, sparsity: float) -> Dict[str, Any]:
+    """An address-like object with width extra fields and depth levels of nesting."""
+    city, state = rng.choice(CITIES)
+    obj = {
+        'street': f"{rng.randint(1, 999)} {rng.choice(LAST_NAMES)} Street",
+        'city': city,
+        'state': state,
+        'zip': f"{rng.randint(10000, 99999)}",
+    }
+    for i in range(width):
+        if rng.random() >= sparsity:
+            obj[f"field_{i}"] = rng.choice((rng.randint(0, 10 ** 6), rng.random() * 1000, 'text', True))
+    if depth > 1:
+        obj['location'] = _nested_object(rng, depth - 1, width, sparsity)
+    return obj
+
+
+def generate_records(rows: int, depth: int = 1, width: int = 0, sparsity: float = 0.1,
+                     seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Generate employee records shaped like input.json.
+    
+    Args:
+        rows: Number of records
+        depth: Nesting depth of the address object (1 = like input.json)
+        width: Extra scalar fields on the top level and every nested object
+        sparsity: Probability that an optional key is missing from a record.
+            termination_date is the exception: it is a rare column, present
+            with probability sparsity (and never when sparsity is 0)
+        seed: Random seed, so datasets are reproducible
+    """
+    rng = random.Random(seed)
+    for i in range(1, rows + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        record = {
+            'id': i,
+            'name': f"{first} {last}",
+            'email': f"{first.lower()}.{last.lower()}{i}@example.com",
+            'age': rng.randint(21, 65),
+            'birthdate': _random_date(rng, 1960, 2003),
+            'salary': round(rng.uniform(40000, 200000), 2),
+            'department': rng.choice(DEPARTMENTS),
+            'is_active': rng.random() < 0.9,
+            'skills': rng.sample(SKILLS, rng.randint(0, 4)),
+            'address': _nested_object(rng, depth, width, sparsity),
+            'hire_date': _random_date(rng, 2005, 2024),
+        }
+        for j in range(width):
+            if rng.random() >= sparsity:
+                record[f"extra_{j}"] = rng.randint(0, 10 ** 9)
+        # Rare column: present (not missing) with probability sparsity
+        if rng.random() < sparsity:
+            record['termination_date'] = _random_date(rng, 2020, 2025)
+        yield record
+
+
+def write_dataset(path: str, records: Iterator[Dict[str, Any]], ndjson: bool) -> None:
+    """Write records as NDJSON, or as a pretty-printed JSON array like input.json."""
+    with open(path, 'w', encoding='utf-8') as f:
+        if ndjson:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write('\n')
+            return
+        f.write('[\n')
+        for i, record in enumerate(records):
+            if i:
+                f.write(',\n')
+            f.write(json.dumps(record, ensure_ascii=False, indent=2))
+        f.write('\n]\n')
+
+
+def bench_generate(args: argparse.Namespace) -> int:
+    ndjson = args.output.endswith(('.ndjson', '.jsonl'))
+    records = generate_records(args.rows, args.depth, args.width, args.sparsity, args.seed)
+    write_dataset(args.output, records, ndjson)
+    print(f"Wrote {args.rows:,} records to {args.output} "
+          f"({os.path.getsize(args.output) / 1024 / 1024:.1f} MB)")
+    return 0
+
+
+def _available_formats() -> List[str]:
+    formats = ['csv', 'tsv']
+    if importlib.util.find_spec('openpyxl'):
+        formats.append('excel')
+    if importlib.util.find_spec('pyarrow'):
+        formats += ['parquet', 'arrow']
+    return formats
+
+
+def run_case(input_path: str, output_format: str, reader: str, workdir: str) -> Dict[str, Any]:
+    """Convert input_path in a fresh interpreter and return its --stats report."""
+    ext = 'xlsx' if output_format == 'excel' else output_format
+    output = os.path.join(workdir, f"out.{ext}")
+    stats_path = os.path.join(workdir, 'stats.json')
+    subprocess.run(
+        [sys.executable, os.path.join(HERE, 'converter.py'), input_path, '-o', output,
+         '-f', output_format, '--reader', reader, '--no-progress', '--stats', stats_path],
+        check=True, capture_output=True, text=True,
+    )
+    with open(stats_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def bench_suite(args: argparse.Namespace) -> int:
+    datasets = {
+        'flat': dict(depth=1, width=0, sparsity=0.1),
+        'wide': dict(depth=1, width=20, sparsity=0.3),
+        'deep': dict(depth=4, width=2, sparsity=0.1),
+    }
+    formats = args.formats or _available_formats()
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, shape in datasets.items():
+            for ndjson in (False, True):
+                path = os.path.join(tmp, f"{name}.{'ndjson' if ndjson else 'json'}")
+                write_dataset(path, generate_records(args.rows, seed=args.seed, **shape), ndjson)
+                for output_format in formats:
+                    for reader in ('stream', 'mmap'):
+                        report = run_case(path, output_format, reader, tmp)
+                        case = {
+                            'dataset': os.path.basename(path),
+                            'format': output_format,
+                            'reader': reader,
+                            'records': report['records'],
+                            'input_bytes': report['input_bytes'],
+                            'seconds': report['seconds'],
+                            'records_per_sec': report['records_per_sec'],
+                            'bytes_per_sec': report['bytes_per_sec'],
+                            'peak_rss_bytes': report['peak_rss_bytes'],
+                        }
+                        results.append(case)
+                        print(f"  {case['dataset']:<13} {output_format:<8} {reader:<7}"
+                              f"{case['records_per_sec']:>12,.0f} rec/s"
+                              f"{case['bytes_per_sec'] / 1024 / 1024:>9.1f} MB/s"
+                              f"{(case['peak_rss_bytes'] or 0) / 1024 / 1024:>9.1f} MB RSS")
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    label = args.label or _git_revision()
+    path = os.path.join(args.results_dir, f"{label}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'label': label,
+            'rows': args.rows,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"\nSaved {len(results)} results to {path}")
+    return 0
+
+
+def bench_compare(args: argparse.Namespace) -> int:
+    with open(args.old, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(args.new, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+
+    def key(case):
+        return case['dataset'], case['format'], case['reader']
+
+    before = {key(case): case for case in old['results']}
+    regressions = 0
+    print(f"{'case':<36}{'records/sec':>28}{'peak RSS (MB)':>24}")
+    for case in new['results']:
+        base = before.get(key(case))
+        if base is None:
+            continue
+        speed = case['records_per_sec'] / base['records_per_sec'] - 1
+        rss_old = (base['peak_rss_bytes'] or 0) / 1024 / 1024
+        rss_new = (case['peak_rss_bytes'] or 0) / 1024 / 1024
+        flag = ''
+        if speed < -args.threshold:
+            flag = '  <-- slower'
+            regressions += 1
+        print(f"{' '.join(key(case)):<36}"
+              f"{base['records_per_sec']:>10,.0f} -> {case['records_per_sec']:>10,.0f} ({speed:+6.1%})"
+              f"{rss_old:>9.1f} -> {rss_new:>7.1f}{flag}")
+    print(f"\n{regressions} case(s) slower by more than {args.threshold:.0%}: "
+          f"{old['label']} -> {new['label']}")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks for the JSON converter')
+    sub = parser.add_subparsers(dest='benchmark', required=True)
+
+    flatten = sub.add_parser('flatten', help='Compare RecordFlattener with flatten_json')
+    flatten.add_argument('--input', default=SAMPLE_INPUT, help='Sample JSON file (default: input.json)')
+    flatten.add_argument('--rows', type=int, default=1_000_000, help='Records to flatten (default: 1,000,000)')
+    flatten.set_defaults(func=bench_flatten)
+
+    startup = sub.add_parser('startup', help='Check the import cost of the plain CSV path')
+    startup.add_argument('--budget-ms', type=float, default=50.0, help='Import time budget (default: 50 ms)')
+    startup.add_argument('--runs', type=int, default=5, help='Runs to take the median of (default: 5)')
+    startup.set_defaults(func=bench_startup)
+
+    generate = sub.add_parser('generate', help='Write a synthetic dataset shaped like input.json')
+    generate.add_argument('output', help='Output path (.ndjson/.jsonl for JSON Lines, else a JSON array)')
+    generate.add_argument('--rows', type=int, default=100_000, help='Number of records (default: 100,000)')
+    generate.add_argument('--depth', type=int, default=1, help='Nesting depth of address (default: 1)')
+    generate.add_argument('--width', type=int, default=0, help='Extra fields per object (default: 0)')
+    generate.add_argument('--sparsity', type=float, default=0.1,
+                          help='Probability an optional key is missing; the rare '
+                               'termination_date is present with this probability (default: 0.1)')
+    generate.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    generate.set_defaults(func=bench_generate)
+
+    suite = sub.add_parser('suite', help='Run every format and reader over synthetic datasets')
+    suite.add_argument('--rows', type=int, default=50_000, help='Records per dataset (default: 50,000)')
+    suite.add_argument('--formats', nargs='+', help='Output formats to run (default: all available)')
+    suite.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    suite.add_argument('--label', help='Name of the results file (default: git revision)')
+    suite.add_argument('--results-dir', default=os.path.join(HERE, 'benchmarks'),
+                       help='Where results are saved (default: benchmarks/)')
+    suite.set_defaults(func=bench_suite)
+
+    compare = sub.add_parser('compare', help='Compare two saved suite results')
+    compare.add_argument('old', help='Baseline results file')
+    compare.add_argument('new', help='New results file')
+    compare.add_argument('--threshold', type=float, default=0.1,
+                         help='Slowdown reported as a regression (default: 0.1 = 10%%)')
+    compare.set_defaults(func=bench_compare)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
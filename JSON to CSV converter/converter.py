@@ -1,66 +1,550 @@
 import json
 import csv
 import os
+import io
+import re
+import mmap
 import sys
+import glob
+import time
+import codecs
+import hashlib
 import argparse
+import itertools
+from collections import deque
+from contextlib import ExitStack, contextmanager, nullcontext, redirect_stdout
+from datetime import date, datetime
 from pathlib import Path
-from typing import List, Dict, Any, Union, Optional, TextIO
-from tqdm import tqdm
-import pandas as pd
+from typing import List, Dict, Any, Union, Optional, TextIO, BinaryIO, Iterable, Iterator, Tuple
 
 
-def read_json_file(file_path: str, show_progress: bool = False) -> List[Dict[str, Any]]:
+# Heavy dependencies are imported on first use so the plain CSV path starts
+# fast: tqdm only when a progress bar is shown, concurrent.futures only for
+# parallel runs, openpyxl and pyarrow inside the writers that need them
+def progress_bar(*args: Any, **kwargs: Any) -> Any:
+    """Create a tqdm progress bar, importing tqdm only when one is actually shown."""
+    from tqdm import tqdm
+    return tqdm(*args, **kwargs)
+
+
+class ConversionStats:
     """
-    Read and parse JSON data from a file with optional progress bar.
+    Per-phase timings, and optionally peak memory, of one conversion.
+    
+    Phases nest: entering a phase pauses the one that was running, so each
+    phase is charged only for its own time (e.g. 'schema' excludes the
+    'read' and 'parse' work done by the records it consumes). Time outside
+    any phase is reported as 'other'.
+    """
+    
+    PHASES = ('read', 'parse', 'schema', 'flatten', 'serialize', 'write', 'other')
+    
+    def __init__(self, track_memory: bool = False):
+        """
+        Args:
+            track_memory: Record the peak Python heap usage of every phase
+                with tracemalloc (noticeably slower)
+        """
+        self.track_memory = track_memory
+        self.seconds = dict.fromkeys(self.PHASES, 0.0)
+        self.peak_memory = dict.fromkeys(self.PHASES, 0)
+        self.records = 0
+        self.bytes_read = 0
+        self._stack = ['other']
+        self._started = self._last = None
+        self.total_seconds = 0.0
+    
+    def start(self) -> None:
+        if self.track_memory:
+            import tracemalloc
+            tracemalloc.start()
+        self._started = self._last = time.perf_counter()
+    
+    def stop(self) -> None:
+        self._switch()
+        self.total_seconds = time.perf_counter() - self._started
+        if self.track_memory:
+            import tracemalloc
+            tracemalloc.stop()
+    
+    def _switch(self) -> None:
+        """Charge the time (and heap peak) since the last switch to the running phase."""
+        now = time.perf_counter()
+        current = self._stack[-1]
+        self.seconds[current] += now - self._last
+        self._last = now
+        if self.track_memory:
+            import tracemalloc
+            peak = tracemalloc.get_traced_memory()[1]
+            if peak > self.peak_memory[current]:
+                self.peak_memory[current] = peak
+            tracemalloc.reset_peak()
+    
+    def enter(self, phase: str) -> None:
+        self._switch()
+        self._stack.append(phase)
+    
+    def exit(self) -> None:
+        self._switch()
+        self._stack.pop()
+    
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self.enter(name)
+        try:
+            yield
+        finally:
+            self.exit()
+    
+    def timed(self, fn: Any, phase: str) -> Any:
+        """Wrap a callable so that every call is charged to phase."""
+        def wrapper(*args, **kwargs):
+            self.enter(phase)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.exit()
+        return wrapper
+    
+    def iter_records(self, iterable: Iterable[Any]) -> Iterator[Any]:
+        """Iterate, charging the time spent producing each item to 'parse'."""
+        it = iter(iterable)
+        while True:
+            self.enter('parse')
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                self.exit()
+            yield item
+    
+    def report(self, **info: Any) -> Dict[str, Any]:
+        """
+        Build the JSON-serializable stats report.
+        
+        Args:
+            **info: Extra top-level fields (input/output paths, format, ...)
+            
+        Returns:
+            Dictionary with totals, throughput and the per-phase breakdown
+        """
+        total = self.total_seconds or 1e-9
+        report = dict(info)
+        report.update({
+            'records': self.records,
+            'bytes_read': self.bytes_read,
+            'seconds': round(self.total_seconds, 6),
+            'records_per_sec': round(self.records / total, 1),
+            'bytes_per_sec': round(self.bytes_read / total, 1),
+            'peak_rss_bytes': _peak_rss_bytes(),
+            'phases': {},
+        })
+        for phase in self.PHASES:
+            entry = {
+                'seconds': round(self.seconds[phase], 6),
+                'share': round(self.seconds[phase] / total, 4),
+            }
+            if self.track_memory:
+                entry['peak_memory_bytes'] = self.peak_memory[phase]
+            report['phases'][phase] = entry
+        return report
+
+
+class _TimedFile:
+    """File wrapper charging read()/write() calls to a ConversionStats phase."""
+    
+    def __init__(self, f: Any, stats: ConversionStats, phase: str):
+        self._f = f
+        self._stats = stats
+        self._phase = phase
+    
+    def read(self, size: int = -1) -> bytes:
+        self._stats.enter(self._phase)
+        try:
+            data = self._f.read(size)
+        finally:
+            self._stats.exit()
+        self._stats.bytes_read += len(data)
+        return data
+    
+    def write(self, data: str) -> int:
+        self._stats.enter(self._phase)
+        try:
+            return self._f.write(data)
+        finally:
+            self._stats.exit()
+
+
+def _phase(stats: Optional[ConversionStats], name: str) -> Any:
+    """stats.phase(name), or a no-op context when stats are not collected."""
+    return nullcontext() if stats is None else stats.phase(name)
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+COMPRESSION_EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz', '.zst': 'zstd'}
+COMPRESSION_LEVELS = {  # (min, max, default) per codec
+    'gzip': (0, 9, 6),
+    'bz2': (1, 9, 9),
+    'xz': (0, 9, 6),
+    'zstd': (1, 22, 3),
+}
+_COMPRESSION_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+)
+
+
+def compression_from_extension(path: str) -> Optional[str]:
+    """The codec implied by a .gz/.bz2/.xz/.zst extension, or None."""
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def strip_compression_extension(path: str) -> str:
+    """'data.json.gz' -> 'data.json'; other paths are returned unchanged."""
+    if compression_from_extension(path):
+        return os.path.splitext(path)[0]
+    return path
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """
+    Detect the compression of an input file from its magic bytes.
+    
+    Args:
+        path: Path to an existing file
+        
+    Returns:
+        'gzip', 'bz2', 'xz', 'zstd', or None for uncompressed files
+    """
+    with open(path, 'rb') as f:
+        head = f.read(6)
+    for magic, codec in _COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def check_compression_level(codec: Optional[str], level: Optional[int]) -> None:
+    """Raise ValueError if level is out of range for codec."""
+    if codec is None or level is None:
+        return
+    low, high, _ = COMPRESSION_LEVELS[codec]
+    if not low <= level <= high:
+        raise ValueError(f"Compression level for {codec} must be between {low} and {high}, got {level}")
+
+
+def open_compressed(path: str, mode: str, codec: str, level: Optional[int] = None) -> BinaryIO:
+    """
+    Open a gzip/bz2/xz/zstd file as a binary stream.
+    
+    Data is (de)compressed on the fly, so no temporary files are needed.
+    
+    Args:
+        path: File path
+        mode: 'rb', 'wb' or 'ab'
+        codec: 'gzip', 'bz2', 'xz' or 'zstd'
+        level: Compression level when writing (default: per codec, see COMPRESSION_LEVELS)
+        
+    Raises:
+        ImportError: For zstd when the zstandard package is not installed
+    """
+    writing = mode != 'rb'
+    if writing:
+        check_compression_level(codec, level)
+        if level is None:
+            level = COMPRESSION_LEVELS[codec][2]
+    if codec == 'gzip':
+        import gzip
+        return gzip.open(path, mode, compresslevel=level) if writing else gzip.open(path, mode)
+    if codec == 'bz2':
+        import bz2
+        return bz2.open(path, mode, compresslevel=level) if writing else bz2.open(path, mode)
+    if codec == 'xz':
+        import lzma
+        return lzma.open(path, mode, preset=level) if writing else lzma.open(path, mode)
+    if codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(
+                "zstd compression requires the zstandard package.\n"
+                "  Install it with: pip install zstandard"
+            )
+        f = open(path, mode)
+        if writing:
+            return zstandard.ZstdCompressor(level=level).stream_writer(f, closefd=True)
+        return zstandard.ZstdDecompressor().stream_reader(f, closefd=True)
+    raise ValueError(f"Unsupported compression: {codec}")
+
+
+def open_input(path: str) -> BinaryIO:
+    """Open an input file for binary reading, decompressing it if needed."""
+    codec = detect_compression(path)
+    return open(path, 'rb') if codec is None else open_compressed(path, 'rb', codec)
+
+
+def open_output(path: str, mode: str = 'w', compression_level: Optional[int] = None) -> TextIO:
+    """
+    Open an output file for writing CSV text (UTF-8, newline='').
+    
+    Paths ending in .gz/.bz2/.xz/.zst are compressed while writing.
+    
+    Args:
+        path: Output file path
+        mode: 'w' to create/truncate or 'a' to append
+        compression_level: Level for compressed outputs (ignored otherwise)
+    """
+    codec = compression_from_extension(path)
+    if codec is None:
+        return open(path, mode, newline='', encoding='utf-8')
+    return io.TextIOWrapper(open_compressed(path, mode + 'b', codec, compression_level),
+                            encoding='utf-8', newline='')
+
+
+READ_CHUNK_SIZE = 64 * 1024  # bytes read from disk per refill
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_MM_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_MISSING = object()
+
+
+def _iter_json_values(f: BinaryIO, pbar: Optional[Any] = None, line_base: int = 0) -> Iterator[Any]:
+    """
+    Incrementally decode top-level records from a binary JSON stream.
+
+    A top-level array yields its elements one at a time; any other document
+    (a single value, or NDJSON/JSON Lines with one value per line) yields
+    each top-level value in turn. Only the undecoded tail of the stream and
+    the record currently being decoded are held in memory.
+
+    Args:
+        f: File object opened in binary mode
+        pbar: Optional progress bar updated with the number of bytes read
+        line_base: Lines before the stream's start, for error messages
+
+    Yields:
+        Parsed top-level records
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buf = ''
+    pos = 0
+    eof = False
+    # Line/column of buf[0] in the whole document, for error messages
+    col_base = 0
+
+    def refill() -> None:
+        nonlocal buf, pos, eof, line_base, col_base
+        # Read at least as much as is still pending so a record larger than
+        # the chunk size is re-scanned a logarithmic number of times only
+        chunk = f.read(max(READ_CHUNK_SIZE, len(buf) - pos))
+        if pbar is not None:
+            pbar.update(len(chunk))
+        newlines = buf.count('\n', 0, pos)
+        if newlines:
+            line_base += newlines
+            col_base = pos - buf.rfind('\n', 0, pos) - 1
+        else:
+            col_base += pos
+        if chunk:
+            buf = buf[pos:] + utf8.decode(chunk)
+        else:
+            buf = buf[pos:] + utf8.decode(b'', final=True)
+            eof = True
+        pos = 0
+
+    def error(msg: str, at: int) -> json.JSONDecodeError:
+        err = json.JSONDecodeError(msg, buf, at)
+        if err.lineno == 1:
+            err.colno += col_base
+        err.lineno += line_base
+        return err
+
+    def peek() -> str:
+        """Skip whitespace and return the next character ('' at EOF)."""
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos < len(buf):
+                return buf[pos]
+            if eof:
+                return ''
+            refill()
+
+    def decode() -> Any:
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                # Errors at the end of the buffer (or inside a string that
+                # runs past it) only mean the record is not complete yet
+                truncated = e.pos >= len(buf) - 8 or e.msg.startswith('Unterminated string')
+                if eof or not truncated:
+                    raise error(e.msg, e.pos) from None
+                refill()
+                continue
+            # A number cut off by the chunk boundary ('12.', '1e+') decodes
+            # as a shorter number, so keep a few characters of lookahead
+            if not eof and len(buf) - end <= 2:
+                refill()
+                continue
+            pos = end
+            return value
+
+    if peek() == '[':
+        pos += 1
+        if peek() == ']':
+            pos += 1
+        else:
+            while True:
+                yield decode()
+                ch = peek()
+                pos += 1
+                if ch == ']':
+                    break
+                if ch != ',':
+                    raise error("Expecting ',' delimiter", pos - 1)
+                peek()
+        if peek():
+            raise error('Extra data', pos)
+    else:
+        while peek():
+            yield decode()
+
+
+_MM_PROGRESS_STEP = 1024 * 1024  # bytes between progress bar updates
+
+
+def _iter_json_values_mmap(mm: mmap.mmap, pbar: Optional[Any] = None) -> Iterator[Any]:
+    """
+    Decode top-level records from a memory-mapped JSON file.
+    
+    NDJSON/JSON Lines are parsed line by line: each line is located with
+    mm.find(), copied out of the mapping and decoded on its own. Anything
+    that is not one value per line (a top-level array, a value spanning
+    several lines, ...) is handed to _iter_json_values() from that point on,
+    reading from the mapping. Yields the same records as _iter_json_values();
+    JSON decoding dominates either way, so neither reader is much faster.
+    
+    Args:
+        mm: The memory-mapped file
+        pbar: Optional progress bar updated with the buffer offset
+        
+    Yields:
+        Parsed top-level records
+    """
+    decode = json.JSONDecoder().raw_decode
+    size = len(mm)
+    pos = 0
+    line = 0
+    reported = 0
+    
+    start = _MM_WHITESPACE.match(mm).end()
+    if start < size and mm[start] != ord('['):
+        while pos < size:
+            end = mm.find(b'\n', pos)
+            end = size if end < 0 else end + 1
+            text = mm[pos:end].decode('utf-8').strip(' \t\r\n')
+            if text:
+                try:
+                    value, used = decode(text)
+                except json.JSONDecodeError:
+                    break
+                if used != len(text):
+                    break
+                yield value
+            pos = end
+            line += 1
+            if pbar is not None and pos - reported >= _MM_PROGRESS_STEP:
+                pbar.update(pos - reported)
+                reported = pos
+    
+    if pbar is not None:
+        pbar.update(pos - reported)
+    if pos < size:
+        mm.seek(pos)
+        yield from _iter_json_values(mm, pbar, line_base=line)
+
+
+READER_MODES = ('stream', 'mmap')
+
+
+def iter_json_records(file_path: str, show_progress: bool = False,
+                      stats: Optional[ConversionStats] = None, reader: str = 'stream') -> Iterator[Any]:
+    """
+    Stream records from a JSON or NDJSON/JSON Lines file with optional progress bar.
+    
+    The file is parsed incrementally, so memory use does not grow with the
+    size of the input. gzip/bz2/xz/zstd files are decompressed on the fly.
     
     Args:
         file_path: Path to the JSON file
         show_progress: Whether to show progress bar for large files
+        stats: Optional ConversionStats charged with 'read' and 'parse' time
+        reader: 'stream' to decode the file in chunks, or 'mmap' to memory-map
+            it and decode NDJSON line by line from the mapping (other JSON
+            documents and compressed files are streamed)
         
-    Returns:
-        List of dictionaries containing the parsed JSON data
+    Yields:
+        Top-level array elements, or each top-level value for other documents
     """
     try:
         # Get file size for progress estimation
         file_size = os.path.getsize(file_path)
+        codec = detect_compression(file_path)
+        if codec is not None:
+            reader = 'stream'
         
-        # Use tqdm to show progress for large files
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with open_input(file_path) as f:
+            pbar = None
             if show_progress and file_size > 1_000_000:  # Show progress for files > 1MB
-                with tqdm(
-                    total=file_size,
+                pbar = progress_bar(
+                    # The decompressed size is not known up front
+                    total=file_size if codec is None else None,
                     unit='B',
                     unit_scale=True,
                     unit_divisor=1024,
                     desc=f"Reading {os.path.basename(file_path)}",
                     leave=False
-                ) as pbar:
-                    # Read file in chunks to show progress
-                    chunks = []
-                    while True:
-                        chunk = f.read(8192)  # 8KB chunks
-                        if not chunk:
-                            break
-                        chunks.append(chunk)
-                        pbar.update(len(chunk.encode('utf-8')))
-                    
-                    # Parse the complete JSON
-                    data = json.loads(''.join(chunks))
-            else:
-                # For small files, just read normally
-                data = json.load(f)
-        
-        # Ensure we return a list
-        if not isinstance(data, list):
-            data = [data]
-            
-        return data
+                )
+            try:
+                if reader == 'mmap':
+                    # Empty files cannot be mapped (and hold no records)
+                    if file_size == 0:
+                        return
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        values = _iter_json_values_mmap(mm, pbar)
+                        if stats is not None:
+                            stats.bytes_read += file_size
+                            values = stats.iter_records(values)
+                        yield from values
+                elif stats is None:
+                    yield from _iter_json_values(f, pbar)
+                else:
+                    yield from stats.iter_records(_iter_json_values(_TimedFile(f, stats, 'read'), pbar))
+            finally:
+                if pbar is not None:
+                    pbar.close()
         
     except json.JSONDecodeError as e:
+        context = e.doc[max(0, e.pos-20):e.pos+20].replace('\n', ' ')
         raise ValueError(
             f"Failed to parse JSON file '{os.path.basename(file_path)}' at line {e.lineno}, column {e.colno}:\n"
             f"  {e.msg}\n"
-            f"  Context: {e.doc[max(0, e.pos-20):e.pos+20].replace('\n', ' ')}..."
+            f"  Context: {context}..."
         )
     except UnicodeDecodeError as e:
         raise ValueError(
@@ -87,6 +571,22 @@ def read_json_file(file_path: str, show_progress: bool = False) -> List[Dict[str
         )
 
 
+def read_json_file(file_path: str, show_progress: bool = False) -> List[Dict[str, Any]]:
+    """
+    Read and parse JSON data from a file with optional progress bar.
+    
+    Loads every record into memory; use iter_json_records() to stream.
+    
+    Args:
+        file_path: Path to the JSON file
+        show_progress: Whether to show progress bar for large files
+        
+    Returns:
+        List of dictionaries containing the parsed JSON data
+    """
+    return list(iter_json_records(file_path, show_progress=show_progress))
+
+
 def flatten_json(nested_json: Dict[str, Any], parent_key: str = '', sep: str = '.') -> Dict[str, Any]:
     """
     Flatten a nested dictionary structure.
@@ -114,143 +614,958 @@ def flatten_json(nested_json: Dict[str, Any], parent_key: str = '', sep: str = '
     flatten(nested_json)
     return items
 
-def get_all_fieldnames(data: List[Dict[str, Any]]) -> List[str]:
+class _ShapeMismatch(Exception):
+    """Raised by a compiled flatten plan when a record does not fit its shape."""
+
+
+_CONTAINER_TYPES = frozenset((dict, list))
+# Same output as json.dumps(x, ensure_ascii=False) without building a new
+# encoder on every call
+_encode_list = json.JSONEncoder(ensure_ascii=False).encode
+
+
+class RecordFlattener:
+    """
+    Flatten records exactly like flatten_json(), using compiled per-schema plans.
+    
+    The first record with a given set of top-level keys is walked once to
+    learn its shape, which is compiled into a specialized function that
+    reads every key path directly (no recursion, no key building). Records
+    whose top-level keys match reuse that plan; a record that deviates
+    further down (different nested keys, a container where a scalar used
+    to be, ...) falls back to the generic flatten_json() walk.
+    
+    When created with fieldnames, row() returns each record as a tuple of
+    values in that column order (None for missing fields), so writers need
+    no per-row dict at all. split_row() does the same but returns list
+    values separately instead of JSON-encoding them.
+    
+    Plans assume records as produced by the json module (plain dicts and
+    lists).
+    """
+    
+    MAX_PLANS = 64  # distinct top-level key layouts to compile before giving up
+    
+    def __init__(self, sep: str = '.', fieldnames: Optional[List[str]] = None):
+        self.sep = sep
+        self.fieldnames = fieldnames
+        self._columns = {name: i for i, name in enumerate(fieldnames or ())}
+        self._plans = {}
+        self._row_plans = {}
+        self._split_plans = {}
+    
+    def __call__(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        if type(record) is dict:
+            plan = self._plan(self._plans, record, as_row=False)
+            if plan is not None:
+                try:
+                    return plan(record)
+                except (_ShapeMismatch, KeyError):
+                    pass
+        return flatten_json(record, sep=self.sep)
+    
+    def row(self, record: Dict[str, Any]) -> tuple:
+        """
+        Flatten a record into a tuple ordered like self.fieldnames.
+        
+        Raises:
+            ValueError: If the record has fields that are not in fieldnames
+        """
+        if type(record) is dict:
+            plan = self._plan(self._row_plans, record, as_row=True)
+            if plan is not None:
+                try:
+                    return plan(record)
+                except (_ShapeMismatch, KeyError):
+                    pass
+        flat = flatten_json(record, sep=self.sep)
+        extra = [key for key in flat if key not in self._columns]
+        if extra:
+            raise ValueError("dict contains fields not in fieldnames: "
+                             + ", ".join(repr(key) for key in extra))
+        return tuple(flat.get(name) for name in self.fieldnames)
+    
+    def split_row(self, record: Dict[str, Any]) -> tuple:
+        """
+        Like row(), but leave list-valued fields out of the row.
+        
+        Returns:
+            (row, lists): the tuple ordered like self.fieldnames, and a tuple
+            of (key path, list) pairs for the list-valued fields
+            
+        Raises:
+            ValueError: If the record has non-list fields that are not in fieldnames
+        """
+        if type(record) is dict:
+            plan = self._plan(self._split_plans, record, as_row=True, split=True)
+            if plan is not None:
+                try:
+                    return plan(record)
+                except (_ShapeMismatch, KeyError):
+                    pass
+        flat, lists = split_list_fields(record, sep=self.sep)
+        extra = [key for key in flat if key not in self._columns]
+        if extra:
+            raise ValueError("dict contains fields not in fieldnames: "
+                             + ", ".join(repr(key) for key in extra))
+        return tuple(flat.get(name) for name in self.fieldnames), tuple(lists)
+    
+    def _plan(self, plans: Dict[tuple, Any], record: Dict[str, Any], as_row: bool,
+              split: bool = False) -> Optional[Any]:
+        layout = tuple(record)
+        plan = plans.get(layout, _MISSING)
+        if plan is _MISSING:
+            plan = self._compile(record, as_row, split) if len(plans) < self.MAX_PLANS else None
+            plans[layout] = plan
+        return plan
+    
+    def _compile(self, record: Dict[str, Any], as_row: bool = False,
+                 split: bool = False) -> Optional[Any]:
+        """Generate a flatten function specialized to the shape of record."""
+        sep = self.sep
+        body = []
+        scalars = []
+        fields = []
+        lists = []
+        counter = itertools.count()
+        
+        def walk(node, var, name):
+            for key, value in node.items():
+                access = f"{var}[{key!r}]"
+                if isinstance(value, dict):
+                    child = f"n{next(counter)}"
+                    body.append(f"    {child} = {access}")
+                    body.append(f"    if type({child}) is not dict or len({child}) != {len(value)}: raise _Mismatch")
+                    walk(value, child, f"{name}{key}{sep}")
+                    continue
+                leaf = f"x{next(counter)}"
+                body.append(f"    {leaf} = {access}")
+                out = f"{name}{key}{sep}".rstrip(sep)
+                if isinstance(value, list):
+                    body.append(f"    if type({leaf}) is not list: raise _Mismatch")
+                    if split:
+                        lists.append((out, leaf))
+                        continue
+                    body.append(f"    {leaf} = _encode({leaf})")
+                else:
+                    scalars.append(leaf)
+                fields.append((out, leaf))
+        
+        walk(record, 'r', '')
+        
+        # Colliding key paths ('a.b' vs {'a': {'b': ...}}) depend on walk
+        # order, which a plan cannot guarantee; leave them to flatten_json
+        outs = {out for out, _ in fields + lists}
+        if len(outs) != len(fields) + len(lists):
+            return None
+        
+        if scalars:
+            checks = ' or '.join(f"type({leaf}) in _containers" for leaf in scalars)
+            body.append(f"    if {checks}: raise _Mismatch")
+        if as_row:
+            # Records with fields outside the header take the checked slow path
+            if any(out not in self._columns for out, _ in fields):
+                return None
+            leaves = dict(fields)
+            items = ''.join(f"{leaves.get(name, 'None')}, " for name in self.fieldnames)
+            if split:
+                pairs = ''.join(f"({out!r}, {leaf}), " for out, leaf in lists)
+                body.append(f"    return ({items}), ({pairs})")
+            else:
+                body.append(f"    return ({items})")
+        else:
+            items = ', '.join(f"{out!r}: {leaf}" for out, leaf in fields)
+            body.append(f"    return {{{items}}}")
+        
+        source = "def plan(r):\n" + "\n".join(body) + "\n"
+        namespace = {
+            '_Mismatch': _ShapeMismatch,
+            '_containers': _CONTAINER_TYPES,
+            '_encode': _encode_list,
+        }
+        exec(compile(source, '<flatten plan>', 'exec'), namespace)
+        return namespace['plan']
+
+
+def flatten_keys(nested_json: Dict[str, Any], sep: str = '.') -> List[str]:
+    """
+    Get the keys flatten_json() would produce, without building the values.
+    
+    Skips the json.dumps() of every list, which makes schema discovery
+    much cheaper than flattening each record.
+    
+    Args:
+        nested_json: The nested dictionary to inspect
+        sep: Separator between nested keys
+        
+    Returns:
+        List of flattened key paths
+    """
+    keys = []
+    
+    def walk(x, name=''):
+        if isinstance(x, dict):
+            for a in x:
+                walk(x[a], f"{name}{a}{sep}")
+        else:
+            keys.append(name.rstrip(sep))
+    
+    walk(nested_json)
+    return keys
+
+def get_all_fieldnames(data: Iterable[Dict[str, Any]]) -> List[str]:
     """
     Get all unique field names from a list of dictionaries, including nested ones.
     
+    This is the schema discovery pass: it streams over data once and keeps
+    only the set of flattened key paths, never the records themselves.
+    
     Args:
-        data: List of dictionaries to extract field names from
+        data: List (or any iterable) of dictionaries to extract field names from
         
     Returns:
         Sorted list of all unique field names
     """
     fieldnames = set()
-    
-    for item in data:
-        flat_item = flatten_json(item)
-        fieldnames.update(flat_item.keys())
-    
-    return sorted(fieldnames)
+    
+    for item in data:
+        fieldnames.update(flatten_keys(item))
+    
+    return sorted(fieldnames)
+
+
+SCHEMA_CACHE_SUFFIX = '.schema.json'
+SCHEMA_CACHE_VERSION = 1
+
+
+def _schema_cache_key(input_path: str) -> Dict[str, int]:
+    st = os.stat(input_path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def load_cached_schema(input_path: str) -> Optional[List[str]]:
+    """
+    Load field names from the schema sidecar file of an input file.
+    
+    The sidecar is only used if the input's size and modification time
+    still match the ones recorded when it was written.
+    
+    Args:
+        input_path: Path to the input JSON file
+        
+    Returns:
+        Cached list of field names, or None if there is no valid cache
+    """
+    try:
+        with open(input_path + SCHEMA_CACHE_SUFFIX, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if (cache.get('version') == SCHEMA_CACHE_VERSION
+                and cache.get('input') == _schema_cache_key(input_path)):
+            return cache['fieldnames']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    return None
+
+
+def save_cached_schema(input_path: str, fieldnames: List[str]) -> None:
+    """
+    Write the schema sidecar file next to an input file.
+    
+    Failing to write the cache (e.g. a read-only input directory) is not an
+    error; the next conversion simply runs schema discovery again.
+    
+    Args:
+        input_path: Path to the input JSON file
+        fieldnames: Field names discovered for the input
+    """
+    cache = {
+        'version': SCHEMA_CACHE_VERSION,
+        'input': _schema_cache_key(input_path),
+        'fieldnames': fieldnames,
+    }
+    try:
+        with open(input_path + SCHEMA_CACHE_SUFFIX, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+    except OSError:
+        pass
+
+CSV_BLOCK_SIZE = 4096  # rows serialized per block
+BOOL_FORMATS = {
+    'python': None,  # True/False, as written by the csv module
+    'lower': ('true', 'false'),
+    'int': ('1', '0'),
+}
+
+
+def _format_date(value: str, fmt: str) -> str:
+    """strftime() an ISO 'YYYY-MM-DD' string; other strings are returned unchanged."""
+    if _ISO_DATE.fullmatch(value):
+        try:
+            return date.fromisoformat(value).strftime(fmt)
+        except ValueError:
+            pass
+    return value
+
+
+class CsvBlockWriter:
+    """
+    Write flattened records to a CSV/TSV file in blocks of rows.
+    
+    Records are flattened straight into row tuples (no per-row dicts), and
+    every block_size rows are coerced column by column and serialized with
+    a single csv.writer.writerows() call into a buffer that is written to
+    the file at once. With the default formatting the output is identical
+    to csv.DictWriter's.
+    
+    Value formatting is column-aware: each option is applied to whole
+    columns of a block at a time.
+    """
+    
+    def __init__(self, f: TextIO, fieldnames: List[str], delimiter: str = ',',
+                 block_size: int = CSV_BLOCK_SIZE, float_format: Optional[str] = None,
+                 bool_format: str = 'python', date_format: Optional[str] = None,
+                 stats: Optional[ConversionStats] = None):
+        """
+        Args:
+            f: Text file opened with newline=''
+            fieldnames: Column names, in output order
+            delimiter: Field delimiter to use
+            block_size: Rows buffered before each write
+            float_format: format() spec for floats, e.g. '.2f' (default: repr)
+            bool_format: 'python' (True/False), 'lower' (true/false) or 'int' (1/0)
+            date_format: strftime() pattern for ISO 'YYYY-MM-DD' date values
+            stats: Optional ConversionStats charged with 'flatten',
+                'serialize' and 'write' time
+        """
+        if bool_format not in BOOL_FORMATS:
+            raise ValueError(f"Unsupported bool format: {bool_format}")
+        self.fieldnames = fieldnames
+        self.block_size = block_size
+        self.float_format = float_format
+        self.bool_values = BOOL_FORMATS[bool_format]
+        self.date_format = date_format
+        self._coerce = bool(float_format or self.bool_values or date_format)
+        self._buffer = io.StringIO(newline='')
+        self._writer = csv.writer(self._buffer, delimiter=delimiter)
+        self._flatten = RecordFlattener(fieldnames=fieldnames).row
+        self._serialize = self._serialize_block
+        self._write = f.write
+        if stats is not None:
+            self._flatten = stats.timed(self._flatten, 'flatten')
+            self._serialize = stats.timed(self._serialize, 'serialize')
+            self._write = stats.timed(self._write, 'write')
+    
+    def writeheader(self) -> None:
+        self._writer.writerow(self.fieldnames)
+        self._flush()
+    
+    def write_records(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Flatten and write records, returning the number of rows written.
+        """
+        return self.write_rows(map(self._flatten, records))
+    
+    def write_rows(self, rows: Iterable[tuple]) -> int:
+        """
+        Write rows that are already tuples ordered like fieldnames.
+        """
+        block_size = self.block_size
+        block = []
+        count = 0
+        for row in rows:
+            block.append(row)
+            if len(block) >= block_size:
+                self._serialize(block)
+                self._flush()
+                count += len(block)
+                block = []
+        if block:
+            self._serialize(block)
+            self._flush()
+            count += len(block)
+        return count
+    
+    def _serialize_block(self, rows: List[tuple]) -> None:
+        if self._coerce:
+            columns = [self._coerce_column(column) for column in zip(*rows)]
+            rows = zip(*columns)
+        self._writer.writerows(rows)
+    
+    def _coerce_column(self, column: tuple) -> Iterable[Any]:
+        """Apply the formatting options to every value of one column."""
+        types = set(map(type, column))
+        types.discard(type(None))
+        if self.float_format and float in types:
+            spec = self.float_format
+            column = [format(v, spec) if type(v) is float else v for v in column]
+        if self.bool_values and bool in types:
+            true, false = self.bool_values
+            column = [(true if v else false) if type(v) is bool else v for v in column]
+        if self.date_format and str in types:
+            fmt = self.date_format
+            column = [_format_date(v, fmt) if type(v) is str else v for v in column]
+        return column
+    
+    def _flush(self) -> None:
+        self._write(self._buffer.getvalue())
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+
+def write_csv(data: Iterable[Dict[str, Any]], output_path: str, delimiter: str = ',', 
+             show_progress: bool = False, fieldnames: Optional[List[str]] = None,
+             append: bool = False, stats: Optional[ConversionStats] = None,
+             compression_level: Optional[int] = None, **format_options: Any) -> int:
+    """
+    Write data to a CSV/TSV file with optional progress bar.
+    Handles nested JSON structures by flattening them.
+    
+    When fieldnames are given, data may be any iterable (e.g. the generator
+    returned by iter_json_records) and is consumed in a single pass.
+    
+    Args:
+        data: List or iterable of dictionaries to write
+        output_path: Path to the output file
+        delimiter: Field delimiter to use
+        show_progress: Whether to show progress bar for large datasets
+        fieldnames: Column names; discovered from data when omitted
+        append: Append rows to an existing file instead of writing a new
+            file with a header (fieldnames must match the existing header).
+            If writing fails, the file is truncated back to its old size
+        stats: Optional ConversionStats charged with 'flatten', 'serialize'
+            and 'write' time
+        compression_level: Level for .gz/.bz2/.xz/.zst output paths
+        **format_options: Value formatting options of CsvBlockWriter
+            (float_format, bool_format, date_format)
+        
+    Returns:
+        Number of rows written
+    """
+    if fieldnames is None:
+        data = list(data)
+    if isinstance(data, list) and not data:
+        return 0
+    
+    # On failure a new file is removed, but rows appended to an existing file
+    # are cut off again so the earlier output survives
+    original_size = os.path.getsize(output_path) if append and os.path.exists(output_path) else None
+    
+    def discard_output():
+        try:
+            if original_size is not None:
+                os.truncate(output_path, original_size)
+            elif os.path.exists(output_path):
+                os.remove(output_path)
+        except OSError:
+            pass
+    
+    try:
+        # Get all possible fieldnames from all records
+        if fieldnames is None:
+            fieldnames = get_all_fieldnames(data)
+        
+        # Ensure the output directory exists
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)) or '.', exist_ok=True)
+        
+        with open_output(output_path, 'a' if append else 'w', compression_level) as f:
+            writer = CsvBlockWriter(f, fieldnames, delimiter, stats=stats, **format_options)
+            if not append:
+                writer.writeheader()
+            
+            # Show progress for >100 rows (row count is unknown for streams)
+            if show_progress and (not isinstance(data, list) or len(data) > 100):
+                data = progress_bar(data, desc="Writing CSV", unit="rows", leave=False)
+            return writer.write_records(data)
+                
+    except PermissionError:
+        discard_output()
+        raise PermissionError(
+            f"Permission denied when trying to write to '{output_path}'.\n"
+            "  The file might be open in another program or you don't have write permissions.\n"
+            "  Please close any programs that might be using the file and try again."
+        )
+    except csv.Error as e:
+        discard_output()
+        raise ValueError(
+            f"Error writing CSV/TSV file '{os.path.basename(output_path)}':\n"
+            f"  {str(e)}\n"
+            f"  This might be due to invalid characters in the data or issues with the delimiter '{delimiter}'.\n"
+            "  Try using a different delimiter or check your data for special characters."
+        )
+    except Exception as e:
+        discard_output()
+        raise Exception(
+            f"Unexpected error while writing to '{os.path.basename(output_path)}':\n"
+            f"  {str(e)}\n"
+            "  The output directory might not exist or the disk might be full."
+        )
+
+
+# Columns added by --explode-lists
+ROW_COLUMN = '_row'        # parent row number, when no parent key is given
+PARENT_COLUMN = '_parent'  # parent key (or row number) in child tables
+INDEX_COLUMN = '_index'    # position of the item in its list
+VALUE_COLUMN = '_value'    # the item itself, for lists of scalars
+
+
+def split_list_fields(record: Dict[str, Any], sep: str = '.') -> tuple:
+    """
+    Flatten a record like flatten_json(), but keep list values apart.
+    
+    Args:
+        record: The nested dictionary to flatten
+        sep: Separator between nested keys
+        
+    Returns:
+        (flat, lists): the flattened non-list fields, and a list of
+        (key path, list) pairs for the list-valued fields
+    """
+    flat = {}
+    lists = []
+    
+    def walk(x, name=''):
+        if isinstance(x, dict):
+            for a in x:
+                walk(x[a], f"{name}{a}{sep}")
+        elif isinstance(x, list):
+            lists.append((name.rstrip(sep), x))
+        else:
+            flat[name.rstrip(sep)] = x
+    
+    walk(record)
+    return flat, lists
+
+
+class _ChildTable:
+    """Builds the rows of one --explode-lists child table."""
+    
+    def __init__(self, fieldnames: List[str]):
+        # fieldnames start with the _parent and _index columns
+        columns = fieldnames[2:]
+        self._flatten = RecordFlattener(fieldnames=columns).row
+        self._scalar = None
+        if VALUE_COLUMN in columns:
+            position = columns.index(VALUE_COLUMN)
+            padding = (None,) * (len(columns) - 1)
+            self._scalar = lambda value: padding[:position] + (value,) + padding[position:]
+    
+    def rows(self, items: List[Any], parent: Any) -> Iterator[tuple]:
+        """Objects are flattened; scalars (and nested lists, as JSON) go to _value."""
+        for index, item in enumerate(items):
+            if type(item) is dict:
+                yield (parent, index) + self._flatten(item)
+            else:
+                if isinstance(item, list):
+                    item = _encode_list(item)
+                yield (parent, index) + self._scalar(item)
+
+
+def get_exploded_fieldnames(data: Iterable[Dict[str, Any]],
+                            parent_key: Optional[str] = None) -> tuple:
+    """
+    Schema discovery for --explode-lists.
+    
+    Args:
+        data: List (or any iterable) of dictionaries
+        parent_key: Flattened field that links child rows to their parent;
+            a _row number column is added to the parent table when omitted
+        
+    Returns:
+        (fieldnames, child_fieldnames): the parent table columns, and a dict
+        mapping each list field's key path to its child table columns
+    """
+    fieldnames = set()
+    children = {}
+    
+    for item in data:
+        flat, lists = split_list_fields(item)
+        fieldnames.update(flat)
+        for path, values in lists:
+            columns = children.setdefault(path, set())
+            for value in values:
+                if type(value) is dict:
+                    columns.update(flatten_keys(value))
+                else:
+                    columns.add(VALUE_COLUMN)
+    
+    if parent_key is not None and parent_key not in fieldnames:
+        raise ValueError(
+            f"Parent key '{parent_key}' is not a field of the input records.\n"
+            "  Use a flattened field name with scalar values, e.g. --parent-key id"
+        )
+    
+    synthetic = (PARENT_COLUMN, INDEX_COLUMN)
+    child_fieldnames = {
+        path: list(synthetic) + sorted(columns.difference(synthetic))
+        for path, columns in sorted(children.items())
+    }
+    fieldnames = sorted(fieldnames)
+    if parent_key is None:
+        fieldnames.insert(0, ROW_COLUMN)
+    return fieldnames, child_fieldnames
+
+
+def child_table_paths(output_path: str, fields: Iterable[str]) -> Dict[str, str]:
+    """
+    Map list fields to their child table files: <stem>_<field><ext>.
+    
+    A compression extension is kept: out.csv.gz -> out_skills.csv.gz
+    
+    Raises:
+        ValueError: If two fields map to the same file name
+    """
+    root, ext = os.path.splitext(strip_compression_extension(output_path))
+    ext += output_path[len(root) + len(ext):]
+    paths = {}
+    for field in fields:
+        paths[field] = f"{root}_{re.sub(r'[^0-9A-Za-z-]+', '_', field)}{ext}"
+    if len(set(paths.values())) != len(paths):
+        raise ValueError(f"List fields map to the same child table file: {', '.join(paths)}")
+    return paths
+
+
+def write_csv_exploded(data: Iterable[Dict[str, Any]], output_path: str,
+                       fieldnames: List[str], child_fieldnames: Dict[str, List[str]],
+                       delimiter: str = ',', show_progress: bool = False,
+                       parent_key: Optional[str] = None, stats: Optional[ConversionStats] = None,
+                       compression_level: Optional[int] = None, **format_options: Any) -> int:
+    """
+    Write records to a parent CSV/TSV file and one child table per list field.
+    
+    Instead of JSON-encoding list values into a column, every item of a list
+    becomes a row of <stem>_<field>.csv with the parent key, its position
+    in the list and either its value (lists of scalars) or its flattened
+    fields (lists of objects). Lists nested inside list items are kept as
+    JSON strings. All tables are written in the same pass over data.
+    
+    Args:
+        data: List or iterable of dictionaries to write
+        output_path: Path to the parent table
+        fieldnames: Parent table columns, as from get_exploded_fieldnames()
+        child_fieldnames: Child table columns per list field
+        delimiter: Field delimiter to use
+        show_progress: Whether to show progress bar
+        parent_key: Parent field written to the child tables' _parent column;
+            the parent row number (the _row column) when omitted
+        stats: Optional ConversionStats to charge time to
+        compression_level: Level for .gz/.bz2/.xz/.zst output paths
+        **format_options: Value formatting options of CsvBlockWriter
+        
+    Returns:
+        Number of parent rows written
+    """
+    paths = child_table_paths(output_path, child_fieldnames)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)) or '.', exist_ok=True)
+    if show_progress:
+        data = progress_bar(data, desc="Writing CSV", unit="rows", leave=False)
+    data = iter(data)
+    count = 0
+    
+    try:
+        with ExitStack() as stack:
+            def open_writer(path, columns):
+                f = stack.enter_context(open_output(path, 'w', compression_level))
+                writer = CsvBlockWriter(f, columns, delimiter, stats=stats, **format_options)
+                writer.writeheader()
+                return writer
+            
+            writer = open_writer(output_path, fieldnames)
+            children = {field: (open_writer(paths[field], columns), _ChildTable(columns))
+                        for field, columns in child_fieldnames.items()}
+            
+            # Without a parent key the _row column is prepended to each row
+            columns = fieldnames if parent_key is not None else fieldnames[1:]
+            split_row = RecordFlattener(fieldnames=columns).split_row
+            key_index = columns.index(parent_key) if parent_key is not None else None
+            
+            while True:
+                block = list(itertools.islice(data, CSV_BLOCK_SIZE))
+                if not block:
+                    break
+                parents = []
+                rows = {field: [] for field in children}
+                with _phase(stats, 'flatten'):
+                    for record in block:
+                        count += 1
+                        row, lists = split_row(record)
+                        if key_index is None:
+                            key = count
+                            row = (count,) + row
+                        else:
+                            key = row[key_index]
+                            if key is None:
+                                raise ValueError(f"Record {count} has no value for parent key "
+                                                 f"'{parent_key}'")
+                        parents.append(row)
+                        for field, items in lists:
+                            rows[field].extend(children[field][1].rows(items, key))
+                writer.write_rows(parents)
+                for field, child_rows in rows.items():
+                    if child_rows:
+                        children[field][0].write_rows(child_rows)
+        return count
+    
+    except Exception as e:
+        for path in [output_path, *paths.values()]:
+            if os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        if isinstance(e, PermissionError):
+            raise PermissionError(
+                f"Permission denied when trying to write to '{output_path}' or its child tables.\n"
+                "  The file might be open in another program or you don't have write permissions."
+            )
+        if isinstance(e, ValueError):
+            raise
+        raise Exception(
+            f"Unexpected error while writing to '{os.path.basename(output_path)}':\n"
+            f"  {str(e)}\n"
+            "  The output directory might not exist or the disk might be full."
+        )
+
+
+PARALLEL_SHARD_SIZE = 64 * 1024 * 1024  # upper bound on bytes per NDJSON shard
+
+
+def is_ndjson_file(file_path: str) -> bool:
+    """
+    Check whether a file looks like NDJSON/JSON Lines (one value per line).
+    
+    Only the first line is inspected: it must hold a complete JSON object.
+    Compressed files are not checked (they are never sharded or appended).
+    
+    Args:
+        file_path: Path to the uncompressed input file
+        
+    Returns:
+        True if the file holds one JSON object per line
+    """
+    with open(file_path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                try:
+                    return isinstance(json.loads(line), dict)
+                except ValueError:
+                    return False
+    return False
+
+
+def split_ndjson_shards(file_path: str, shard_size: int) -> List[tuple]:
+    """
+    Split an NDJSON file into byte ranges that start and end on line boundaries.
+    
+    Args:
+        file_path: Path to the NDJSON file
+        shard_size: Approximate number of bytes per shard
+        
+    Returns:
+        List of (start, end) byte offsets covering the whole file, in order
+    """
+    file_size = os.path.getsize(file_path)
+    offsets = [0]
+    
+    with open(file_path, 'rb') as f:
+        pos = shard_size
+        while pos < file_size:
+            # Move the cut forward to just after the next newline
+            f.seek(pos)
+            f.readline()
+            pos = f.tell()
+            if pos >= file_size:
+                break
+            offsets.append(pos)
+            pos += shard_size
+    
+    offsets.append(file_size)
+    return list(zip(offsets, offsets[1:]))
+
+
+class _ByteRange:
+    """Read-only view of bytes [start, end) of a binary file."""
+    
+    def __init__(self, f: BinaryIO, start: int, end: int):
+        f.seek(start)
+        self._f = f
+        self._remaining = end - start
+    
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._f.read(size)
+        self._remaining -= len(data)
+        return data
+
+
+def _iter_range_records(file_path: str, start: int, end: int) -> Iterator[Any]:
+    """Stream the NDJSON records stored in bytes [start, end) of a file."""
+    try:
+        with open(file_path, 'rb') as f:
+            yield from _iter_json_values(_ByteRange(f, start, end))
+    except json.JSONDecodeError as e:
+        raise ValueError(
+            f"Failed to parse JSON file '{os.path.basename(file_path)}' at line {e.lineno}, "
+            f"column {e.colno} counting from byte offset {start}:\n"
+            f"  {e.msg}"
+        )
+
+
+def _shard_fieldnames(task: tuple) -> set:
+    file_path, start, end = task
+    fieldnames = set()
+    for item in _iter_range_records(file_path, start, end):
+        fieldnames.update(flatten_keys(item))
+    return fieldnames
 
-def write_csv(data: List[Dict[str, Any]], output_path: str, delimiter: str = ',', 
-             show_progress: bool = False) -> None:
+
+def _shard_to_csv(task: tuple) -> Tuple[str, int]:
+    file_path, start, end, fieldnames, delimiter, format_options = task
+    out = io.StringIO(newline='')
+    writer = CsvBlockWriter(out, fieldnames, delimiter, **format_options)
+    rows = writer.write_records(_iter_range_records(file_path, start, end))
+    return out.getvalue(), rows
+
+
+def _ordered_pool_map(pool: Any, fn: Any, tasks: List[tuple], window: int) -> Iterator[Any]:
+    """Like pool.map(), but with at most `window` results waiting to be consumed."""
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(fn, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def write_csv_parallel(input_path: str, output_path: str, delimiter: str = ',',
+                       workers: int = 2, show_progress: bool = False,
+                       fieldnames: Optional[List[str]] = None, compression_level: Optional[int] = None,
+                       stats: Optional[ConversionStats] = None, **format_options: Any) -> List[str]:
     """
-    Write data to a CSV/TSV file with optional progress bar.
-    Handles nested JSON structures by flattening them.
+    Convert an NDJSON file to CSV/TSV using a pool of worker processes.
+    
+    The input is split into byte-range shards on line boundaries. Each shard
+    is flattened and serialized to a CSV fragment in a worker, and the
+    fragments are written out in input order under a single header, so the
+    output is byte-identical to write_csv().
     
     Args:
-        data: List of dictionaries to write
+        input_path: Path to the NDJSON input file
         output_path: Path to the output file
         delimiter: Field delimiter to use
-        show_progress: Whether to show progress bar for large datasets
+        workers: Number of worker processes
+        show_progress: Whether to show progress bar
+        fieldnames: Column names; discovered in parallel when omitted
+        compression_level: Level for .gz/.bz2/.xz/.zst output paths
+        stats: Optional ConversionStats; records and bytes read are counted
+            here, the time spent in the workers is not broken down
+        **format_options: Value formatting options of CsvBlockWriter
+        
+    Returns:
+        The column names used for the header
     """
-    if not data:
-        return
+    file_size = os.path.getsize(input_path)
+    # Several shards per worker keeps the pool busy when shards are uneven
+    shard_size = max(1024 * 1024, min(PARALLEL_SHARD_SIZE, file_size // (workers * 4) + 1))
+    shards = split_ndjson_shards(input_path, shard_size)
     
-    try:
-        # Get all possible fieldnames from all records
-        fieldnames = get_all_fieldnames(data)
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if fieldnames is None:
+            tasks = [(input_path, start, end) for start, end in shards]
+            found = set()
+            for shard_fields in _ordered_pool_map(pool, _shard_fieldnames, tasks, workers * 2):
+                found.update(shard_fields)
+            fieldnames = sorted(found)
+            if stats is not None:
+                stats.bytes_read += file_size
         
-        # Ensure the output directory exists
         os.makedirs(os.path.dirname(os.path.abspath(output_path)) or '.', exist_ok=True)
         
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=delimiter)
-            writer.writeheader()
+        tasks = [(input_path, start, end, fieldnames, delimiter, format_options)
+                 for start, end in shards]
+        with open_output(output_path, 'w', compression_level) as f:
+            CsvBlockWriter(f, fieldnames, delimiter).writeheader()
             
-            if show_progress and len(data) > 100:  # Show progress for >100 rows
-                for row in tqdm(data, desc="Writing CSV", unit="rows", leave=False):
-                    writer.writerow(flatten_json(row))
+            fragments = _ordered_pool_map(pool, _shard_to_csv, tasks, workers * 2)
+            total_rows = 0
+            if show_progress:
+                with progress_bar(total=file_size, unit='B', unit_scale=True, unit_divisor=1024,
+                          desc=f"Writing with {workers} workers", leave=False) as pbar:
+                    for (start, end), (fragment, rows) in zip(shards, fragments):
+                        f.write(fragment)
+                        total_rows += rows
+                        pbar.update(end - start)
             else:
-                for row in data:
-                    writer.writerow(flatten_json(row))
-                
-    except PermissionError:
-        if os.path.exists(output_path):
-            try:
-                os.remove(output_path)
-            except:
-                pass
-        raise PermissionError(
-            f"Permission denied when trying to write to '{output_path}'.\n"
-            "  The file might be open in another program or you don't have write permissions.\n"
-            "  Please close any programs that might be using the file and try again."
-        )
-    except csv.Error as e:
-        if os.path.exists(output_path):
-            try:
-                os.remove(output_path)
-            except:
-                pass
-        raise ValueError(
-            f"Error writing CSV/TSV file '{os.path.basename(output_path)}':\n"
-            f"  {str(e)}\n"
-            f"  This might be due to invalid characters in the data or issues with the delimiter '{delimiter}'.\n"
-            "  Try using a different delimiter or check your data for special characters."
-        )
-    except Exception as e:
-        if os.path.exists(output_path):
-            try:
-                os.remove(output_path)
-            except:
-                pass
-        raise Exception(
-            f"Unexpected error while writing to '{os.path.basename(output_path)}':\n"
-            f"  {str(e)}\n"
-            "  The output directory might not exist or the disk might be full."
-        )
+                for fragment, rows in fragments:
+                    f.write(fragment)
+                    total_rows += rows
+    
+    if stats is not None:
+        stats.records += total_rows
+        stats.bytes_read += file_size
+    return fieldnames
+
 
+EXCEL_MAX_ROWS = 1_048_576  # rows per worksheet, including the header row
 
-def write_excel(data: List[Dict[str, Any]], output_path: str, show_progress: bool = False) -> None:
+
+def write_excel(data: Iterable[Dict[str, Any]], output_path: str, show_progress: bool = False,
+                fieldnames: Optional[List[str]] = None) -> int:
     """
     Write data to an Excel file with optional progress bar.
     
+    Rows are streamed into a write-only workbook, so memory use does not
+    grow with the number of records. Data that does not fit on one sheet
+    continues on Sheet2, Sheet3, ... each with its own header row.
+    
     Args:
-        data: List of dictionaries to write
+        data: List or iterable of dictionaries to write
         output_path: Path to the output Excel file
         show_progress: Whether to show progress bar for large datasets
+        fieldnames: Column names; discovered from data when omitted
+        
+    Returns:
+        Number of rows written
     """
-    if not data:
-        return
+    if fieldnames is None:
+        data = list(data)
+        fieldnames = get_all_fieldnames(data)
+    if isinstance(data, list) and not data:
+        return 0
+    rows = 0
+    
+    temp_path = f"{output_path}.tmp"
     
     try:
-        # Convert data to DataFrame
-        if show_progress and len(data) > 1000:  # Show progress for >1000 rows
-            # Process in chunks to show progress
-            chunk_size = 1000
-            chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
-            
-            with tqdm(total=len(data), desc="Processing data", unit="rows", leave=False) as pbar:
-                dfs = []
-                for chunk in chunks:
-                    dfs.append(pd.DataFrame(chunk))
-                    pbar.update(len(chunk))
-                
-                df = pd.concat(dfs, ignore_index=True)
-        else:
-            df = pd.DataFrame(data)
+        from openpyxl import Workbook
         
-        # Write to Excel with progress for large DataFrames
-        if show_progress and len(df) > 1000:
-            with tqdm(total=100, desc="Writing Excel", unit="%", leave=False) as pbar:
-                # Create a temporary file to write to
-                temp_path = f"{output_path}.tmp"
-                
-                # Write to Excel with chunks to show progress
-                writer = pd.ExcelWriter(temp_path, engine='openpyxl')
-                df.to_excel(writer, index=False)
-                
-                # Manually save with progress updates
-                writer.book.save(temp_path)
-                pbar.update(100)
-                
-                # Rename temp file to final name
-                if os.path.exists(output_path):
-                    os.remove(output_path)
-                os.rename(temp_path, output_path)
-        else:
-            # For smaller files, just write directly
-            df.to_excel(output_path, index=False, engine='openpyxl')
+        workbook = Workbook(write_only=True)
+        sheet = None
+        sheet_rows = EXCEL_MAX_ROWS
+        flatten = RecordFlattener()
+        
+        # Show progress for >1000 rows (row count is unknown for streams)
+        if show_progress and (not isinstance(data, list) or len(data) > 1000):
+            data = progress_bar(data, desc="Writing Excel", unit="rows", leave=False)
+        
+        for row in data:
+            if sheet_rows >= EXCEL_MAX_ROWS:
+                sheet = workbook.create_sheet(f"Sheet{len(workbook.worksheets) + 1}")
+                sheet.append(fieldnames)
+                sheet_rows = 1
+            flat = flatten(row)
+            sheet.append([flat.get(name) for name in fieldnames])
+            sheet_rows += 1
+            rows += 1
+        
+        # Write to a temporary file first so a failed save leaves no partial output
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)) or '.', exist_ok=True)
+        workbook.save(temp_path)
+        os.replace(temp_path, output_path)
+        return rows
             
     except ImportError as e:
         if 'openpyxl' in str(e):
@@ -263,11 +1578,10 @@ def write_excel(data: List[Dict[str, Any]], output_path: str, show_progress: boo
             raise ImportError(
                 f"Missing required dependency: {str(e)}\n"
                 "  Please install the required packages with:\n"
-                "  pip install pandas openpyxl"
+                "  pip install openpyxl"
             )
     except Exception as e:
         # Clean up any temporary files on error
-        temp_path = f"{output_path}.tmp"
         if os.path.exists(temp_path):
             os.remove(temp_path)
         if os.path.exists(output_path):
@@ -294,22 +1608,395 @@ def write_excel(data: List[Dict[str, Any]], output_path: str, show_progress: boo
             )
 
 
+CHECKPOINT_SUFFIX = '.checkpoint.json'
+CHECKPOINT_VERSION = 1
+_CHECKPOINT_HEAD_BYTES = 4096  # input prefix hashed to detect a replaced file
+
+
+def _complete_ndjson_end(file_path: str) -> int:
+    """
+    Return the offset just past the last complete record of an NDJSON file.
+    
+    A trailing line without a newline is only counted once it parses as a
+    complete JSON object, so a record that is still being appended is left
+    for the next run.
+    """
+    file_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        pos = file_size
+        tail = b''
+        while pos > 0:
+            step = min(READ_CHUNK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+            newline = tail.rfind(b'\n')
+            if newline >= 0:
+                end = pos + newline + 1
+                break
+        else:
+            end = 0
+        
+        f.seek(end)
+        last_line = f.read(file_size - end)
+    if last_line.strip():
+        try:
+            if isinstance(json.loads(last_line), dict):
+                return file_size
+        except ValueError:
+            pass
+    return end
+
+
+def _checkpoint_head(file_path: str, offset: int) -> str:
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read(min(offset, _CHECKPOINT_HEAD_BYTES))).hexdigest()
+
+
+def load_checkpoint(input_path: str, output_path: str, delimiter: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the incremental conversion checkpoint stored next to an output file.
+    
+    The checkpoint is only valid if it was written for the same input and
+    delimiter, the output file has not been changed since, and the input
+    still starts with the same bytes and has not shrunk (i.e. it was only
+    appended to).
+    
+    Args:
+        input_path: Path to the NDJSON input file
+        output_path: Path to the CSV/TSV output file
+        delimiter: Field delimiter of the output
+        
+    Returns:
+        The checkpoint ('offset', 'fieldnames', ...) or None if it cannot be used
+    """
+    try:
+        with open(output_path + CHECKPOINT_SUFFIX, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        valid = (
+            checkpoint.get('version') == CHECKPOINT_VERSION
+            and checkpoint['input'] == os.path.abspath(input_path)
+            and checkpoint['delimiter'] == delimiter
+            and checkpoint['output_size'] == os.path.getsize(output_path)
+            and checkpoint['offset'] <= os.path.getsize(input_path)
+            and checkpoint['head'] == _checkpoint_head(input_path, checkpoint['offset'])
+        )
+        return checkpoint if valid else None
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def save_checkpoint(input_path: str, output_path: str, delimiter: str,
+                    offset: int, fieldnames: List[str]) -> None:
+    """
+    Record how far an incremental conversion got, next to the output file.
+    
+    Args:
+        input_path: Path to the NDJSON input file
+        output_path: Path to the CSV/TSV output file
+        delimiter: Field delimiter of the output
+        offset: Input byte offset up to which records have been converted
+        fieldnames: Header of the output file
+    """
+    checkpoint = {
+        'version': CHECKPOINT_VERSION,
+        'input': os.path.abspath(input_path),
+        'delimiter': delimiter,
+        'offset': offset,
+        'head': _checkpoint_head(input_path, offset),
+        'output_size': os.path.getsize(output_path),
+        'fieldnames': fieldnames,
+    }
+    checkpoint_path = output_path + CHECKPOINT_SUFFIX
+    with open(checkpoint_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(checkpoint_path + '.tmp', checkpoint_path)
+
+
+def write_csv_incremental(input_path: str, output_path: str, delimiter: str = ',',
+                          show_progress: bool = False, stats: Optional[ConversionStats] = None,
+                          **format_options: Any) -> int:
+    """
+    Convert only the records appended to an NDJSON file since the last run.
+    
+    A checkpoint next to the output records the input offset and header of
+    the last run. New records are appended to the existing CSV/TSV file when
+    they fit its header. If they bring new columns the output is rewritten
+    with the wider header, and if there is no usable checkpoint (first run,
+    input truncated or replaced, output edited) the whole input is converted.
+    
+    Args:
+        input_path: Path to the NDJSON input file
+        output_path: Path to the CSV/TSV output file
+        delimiter: Field delimiter to use
+        show_progress: Whether to show progress bar
+        stats: Optional ConversionStats charged like write_csv()
+        **format_options: Value formatting options of CsvBlockWriter; use the
+            same ones on every run so appended rows match the earlier ones
+        
+    Returns:
+        Number of rows written (0 when there are no new records)
+    """
+    end = _complete_ndjson_end(input_path)
+    checkpoint = load_checkpoint(input_path, output_path, delimiter)
+    
+    if checkpoint is not None:
+        start = checkpoint['offset']
+        if start >= end:
+            print("No new records since the last run")
+            return 0
+        
+        new_fields = get_all_fieldnames(_iter_range_records(input_path, start, end))
+        fieldnames = checkpoint['fieldnames']
+        
+        if set(new_fields) <= set(fieldnames):
+            rows = write_csv(_iter_range_records(input_path, start, end), output_path, delimiter,
+                             show_progress=show_progress, fieldnames=fieldnames, append=True,
+                             stats=stats, **format_options)
+            if stats is not None:
+                stats.bytes_read += 2 * (end - start)  # the column scan and the write
+            save_checkpoint(input_path, output_path, delimiter, end, fieldnames)
+            print(f"Appended {rows} new record(s) (input offset {start} -> {end})")
+            return rows
+        
+        # The old header already covers everything before the checkpoint
+        fieldnames = sorted(set(fieldnames) | set(new_fields))
+        print(f"New columns found ({', '.join(sorted(set(new_fields) - set(checkpoint['fieldnames'])))}); "
+              "rewriting the output")
+    else:
+        fieldnames = get_all_fieldnames(_iter_range_records(input_path, 0, end))
+    
+    rows = write_csv(_iter_range_records(input_path, 0, end), output_path, delimiter,
+                     show_progress=show_progress, fieldnames=fieldnames, stats=stats,
+                     **format_options)
+    if stats is not None:
+        stats.bytes_read += 2 * end  # the column scan and the write
+    save_checkpoint(input_path, output_path, delimiter, end, fieldnames)
+    print(f"Converted {rows} record(s) (input offset 0 -> {end})")
+    return rows
+
+
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+DEFAULT_BATCH_SIZE = 65_536  # rows per Parquet row group / Arrow record batch
+
+_ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+_ISO_DATETIME = re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d{1,6})?)?')
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _value_type(value: Any) -> Optional[str]:
+    """Classify a flattened value as one of the column types (None for null)."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int' if _INT64_MIN <= value <= _INT64_MAX else 'string'
+    if isinstance(value, float):
+        return 'float'
+    if isinstance(value, str):
+        # The shape alone lets through values like '2023-02-30', which would
+        # fail when the column is converted
+        try:
+            if _ISO_DATE.fullmatch(value):
+                date.fromisoformat(value)
+                return 'date'
+            if _ISO_DATETIME.fullmatch(value):
+                datetime.fromisoformat(value)
+                return 'datetime'
+        except ValueError:
+            pass
+    return 'string'
+
+
+def _merge_types(current: Optional[str], new: Optional[str]) -> Optional[str]:
+    if current is None or current == new:
+        return new
+    if new is None:
+        return current
+    if {current, new} == {'int', 'float'}:
+        return 'float'
+    if {current, new} == {'date', 'datetime'}:
+        return 'datetime'
+    return 'string'
+
+
+def infer_column_types(data: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Infer a column type for every flattened field in a single streaming pass.
+    
+    Types are 'int', 'float', 'bool', 'date' (ISO 'YYYY-MM-DD' strings),
+    'datetime' (ISO timestamps without a timezone) and 'string'. Columns with
+    mixed types widen int to float and date to datetime; anything else
+    becomes 'string'. Columns that are always null are 'string'.
+    
+    Args:
+        data: Iterable of (nested) dictionaries
+        
+    Returns:
+        Mapping of field name to column type, sorted by field name
+    """
+    types = {}
+    flatten = RecordFlattener()
+    
+    for item in data:
+        for key, value in flatten(item).items():
+            value_type = _value_type(value)
+            if key not in types:
+                types[key] = value_type
+            elif value_type != types[key]:
+                types[key] = _merge_types(types[key], value_type)
+    
+    return {key: types[key] or 'string' for key in sorted(types)}
+
+
+def _to_arrow_array(pa: Any, values: List[Any], column_type: str) -> Any:
+    """Build a typed Arrow array from one column of flattened values."""
+    if column_type == 'int':
+        return pa.array(values, type=pa.int64())
+    if column_type == 'float':
+        return pa.array(values, type=pa.float64())
+    if column_type == 'bool':
+        return pa.array(values, type=pa.bool_())
+    if column_type == 'date':
+        return pa.array([None if v is None else date.fromisoformat(v) for v in values],
+                        type=pa.date32())
+    if column_type == 'datetime':
+        return pa.array([None if v is None else datetime.fromisoformat(v) for v in values],
+                        type=pa.timestamp('us'))
+    return pa.array([v if v is None or type(v) is str else str(v) for v in values],
+                    type=pa.string())
+
+
+def write_columnar(data: Iterable[Dict[str, Any]], output_path: str,
+                   column_types: Dict[str, str], output_format: str = 'parquet',
+                   batch_size: int = DEFAULT_BATCH_SIZE, show_progress: bool = False) -> int:
+    """
+    Write data to a Parquet or Arrow IPC (Feather v2) file with typed columns.
+    
+    Records are flattened and written in batches of batch_size rows as they
+    stream in, so memory use is bounded by the batch size.
+    
+    Args:
+        data: Iterable of dictionaries to write
+        output_path: Path to the output file
+        column_types: Field name to column type, as returned by infer_column_types()
+        output_format: 'parquet' or 'arrow'
+        batch_size: Number of rows per record batch / row group
+        show_progress: Whether to show progress bar
+        
+    Returns:
+        Number of rows written
+    """
+    try:
+        import pyarrow as pa
+        if output_format == 'parquet':
+            import pyarrow.parquet as pq
+        else:
+            import pyarrow.ipc
+    except ImportError:
+        raise ImportError(
+            f"The 'pyarrow' package is required for {output_format.capitalize()} support.\n"
+            "  Please install it by running:\n"
+            "  pip install pyarrow"
+        )
+    
+    fieldnames = list(column_types)
+    schema = pa.schema([
+        pa.field(name, _to_arrow_array(pa, [], column_types[name]).type)
+        for name in fieldnames
+    ])
+    
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)) or '.', exist_ok=True)
+    
+    if output_format == 'parquet':
+        writer = pq.ParquetWriter(output_path, schema)
+        write_batch = writer.write_batch
+    else:
+        writer = pa.ipc.new_file(output_path, schema)
+        write_batch = writer.write_batch
+    
+    def flush(rows):
+        columns = list(zip(*rows)) if rows else [[] for _ in fieldnames]
+        arrays = [_to_arrow_array(pa, list(column), column_types[name])
+                  for name, column in zip(fieldnames, columns)]
+        write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+    
+    try:
+        flatten = RecordFlattener()
+        if show_progress:
+            data = progress_bar(data, desc=f"Writing {output_format.capitalize()}", unit="rows", leave=False)
+        
+        rows = []
+        written = 0
+        for item in data:
+            flat = flatten(item)
+            rows.append([flat.get(name) for name in fieldnames])
+            if len(rows) >= batch_size:
+                flush(rows)
+                written += len(rows)
+                rows = []
+        if rows:
+            flush(rows)
+            written += len(rows)
+        return written
+    except (ValueError, TypeError, pa.ArrowException) as e:
+        raise ValueError(
+            f"Error writing {output_format.capitalize()} file '{os.path.basename(output_path)}':\n"
+            f"  {str(e)}\n"
+            "  A value might not match the type inferred for its column.\n"
+            "  Try converting to CSV instead or check your data for issues."
+        )
+    finally:
+        writer.close()
+
+
 def convert_json_to_format(
-    input_path: str, 
+    input_path: Union[str, List[str]], 
     output_path: str, 
     output_format: str = 'csv',
     delimiter: str = ',',
-    show_progress: bool = True
+    show_progress: bool = True,
+    schema_cache: bool = False,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    incremental: bool = False,
+    stats: Optional[ConversionStats] = None,
+    reader: str = 'stream',
+    float_format: Optional[str] = None,
+    bool_format: str = 'python',
+    date_format: Optional[str] = None,
+    explode_lists: bool = False,
+    parent_key: Optional[str] = None,
+    compression_level: Optional[int] = None
 ) -> None:
     """
     Convert JSON file to specified format with progress tracking.
     
     Args:
-        input_path: Path to input JSON file
+        input_path: Path to input JSON or NDJSON/JSON Lines file, or a list of
+            paths to merge into one output with the union of their columns
         output_path: Path for output file
-        output_format: Output format ('csv', 'tsv', or 'excel')
+        output_format: Output format ('csv', 'tsv', 'excel', 'parquet' or 'arrow')
         delimiter: Delimiter to use for CSV/TSV (default: ',' for CSV, '\t' for TSV)
         show_progress: Whether to show progress bars
+        schema_cache: Reuse/store the CSV header in a sidecar file next to the input
+        workers: Number of worker processes for NDJSON to CSV/TSV conversion
+        batch_size: Rows per record batch for Parquet/Arrow output
+        incremental: Only convert records appended to an NDJSON input since
+            the last run, using a checkpoint next to the CSV/TSV output
+        stats: Optional ConversionStats to collect per-phase timings in; the
+            breakdown is most detailed for the single-process CSV/TSV path
+        reader: Input reader, 'stream' (chunked reads) or 'mmap' (memory-mapped)
+        float_format: CSV/TSV: format() spec for floats, e.g. '.2f'
+        bool_format: CSV/TSV: 'python' (True/False), 'lower' (true/false) or 'int' (1/0)
+        date_format: CSV/TSV: strftime() pattern for ISO 'YYYY-MM-DD' dates
+        explode_lists: CSV/TSV: write list fields to child tables
+            <stem>_<field>.csv instead of JSON strings (see write_csv_exploded)
+        parent_key: Field linking child table rows to their parent row
+            (default: the parent row number)
+        compression_level: Level for CSV/TSV outputs ending in .gz, .bz2,
+            .xz or .zst (inputs with those codecs are detected and read as is)
     """
     # Set default delimiter based on format if not specified
     if output_format == 'tsv' and delimiter == ',':
@@ -318,27 +2005,155 @@ def convert_json_to_format(
     # Determine if we should show progress (only for non-quiet mode and TTY)
     show_progress = show_progress and sys.stdout.isatty()
     
+    format_options = {
+        'float_format': float_format,
+        'bool_format': bool_format,
+        'date_format': date_format,
+    }
+    
+    input_paths = [input_path] if isinstance(input_path, str) else list(input_path)
+    if len(input_paths) == 1:
+        input_path = input_paths[0]
+    else:
+        # Sidecar caches and NDJSON sharding are per input file
+        input_path = f"{len(input_paths)} files"
+        schema_cache = False
+        workers = 1
+        if incremental:
+            raise ValueError("Incremental conversion needs a single input file")
+    
+    if explode_lists:
+        if output_format not in ('csv', 'tsv'):
+            raise ValueError("--explode-lists is only supported for CSV/TSV output")
+        if incremental:
+            raise ValueError("--explode-lists cannot be combined with --incremental")
+        # Child table columns are not part of the cached header, and the
+        # parallel writer produces a single table
+        schema_cache = False
+        workers = 1
+    elif parent_key is not None:
+        raise ValueError("--parent-key is only used with --explode-lists")
+    
+    output_codec = compression_from_extension(output_path)
+    if output_codec is not None:
+        if output_format not in ('csv', 'tsv'):
+            raise ValueError(
+                f"Compressed output ({output_codec}) is only supported for CSV/TSV.\n"
+                "  Excel, Parquet and Arrow files are compressed by their own format."
+            )
+        check_compression_level(output_codec, compression_level)
+    elif compression_level is not None:
+        raise ValueError("--compression-level is only used with compressed CSV/TSV output "
+                         "(-o ending in .gz, .bz2, .xz or .zst)")
+    compressed_input = any(os.path.isfile(path) and detect_compression(path)
+                           for path in input_paths)
+    if compressed_input or output_codec is not None:
+        if incremental:
+            raise ValueError(
+                "Incremental conversion needs an uncompressed NDJSON input and CSV/TSV output\n"
+                "  Records are appended by byte offset, which compressed streams do not support."
+            )
+        # Byte-range sharding needs random access to the input
+        if compressed_input:
+            workers = 1
+    
+    def open_records() -> Iterator[Any]:
+        if len(input_paths) == 1:
+            return iter_json_records(input_paths[0], show_progress=show_progress,
+                                     stats=stats, reader=reader)
+        return itertools.chain.from_iterable(
+            iter_json_records(path, show_progress=show_progress, stats=stats, reader=reader)
+            for path in input_paths
+        )
+    
+    if incremental:
+        if output_format not in ('csv', 'tsv'):
+            raise ValueError("Incremental conversion is only supported for CSV/TSV output")
+        if not is_ndjson_file(input_path):
+            raise ValueError(
+                f"Incremental conversion needs an NDJSON/JSON Lines input: {input_path}\n"
+                "  Records are appended by byte offset, which only works with one record per line."
+            )
+        rows = write_csv_incremental(input_path, output_path, delimiter, show_progress=show_progress,
+                                     stats=stats, **format_options)
+        if stats is not None:
+            stats.records = rows
+        return
+    
     try:
         # Read with progress
         if show_progress:
             print(f"Reading {os.path.basename(input_path)}...")
             
-        data = read_json_file(input_path, show_progress=show_progress)
+        records_iter = open_records()
+        first = next(records_iter, _MISSING)
         
-        if not data:
+        if first is _MISSING:
             print("Warning: No data found in the input file")
             return
+        records = itertools.chain([first], records_iter)
             
         # Write with progress
         if show_progress:
             print(f"Converting to {output_format.upper()}...")
         
-        if output_format in ('csv', 'tsv'):
-            write_csv(data, output_path, delimiter, show_progress=show_progress)
-        elif output_format == 'excel':
+        if output_format == 'excel':
             if not output_path.lower().endswith(('.xlsx', '.xls')):
                 output_path = f"{os.path.splitext(output_path)[0]}.xlsx"
-            write_excel(data, output_path, show_progress=show_progress)
+        
+        if explode_lists:
+            with _phase(stats, 'schema'):
+                fieldnames, child_fieldnames = get_exploded_fieldnames(records, parent_key)
+            rows = write_csv_exploded(open_records(), output_path, fieldnames, child_fieldnames,
+                                      delimiter, show_progress=show_progress, parent_key=parent_key,
+                                      stats=stats, compression_level=compression_level,
+                                      **format_options)
+            if stats is not None:
+                stats.records = rows
+        elif output_format in ('csv', 'tsv', 'excel'):
+            # The header needs every column up front, so stream the file
+            # twice rather than keeping the records in memory, unless the
+            # schema sidecar is still valid for this input
+            fieldnames = load_cached_schema(input_path) if schema_cache else None
+            if workers > 1 and output_format != 'excel':
+                if is_ndjson_file(input_path):
+                    records_iter.close()
+                    discovered = fieldnames is None
+                    with _phase(stats, 'write'):
+                        fieldnames = write_csv_parallel(input_path, output_path, delimiter, workers,
+                                                        show_progress=show_progress, fieldnames=fieldnames,
+                                                        compression_level=compression_level,
+                                                        stats=stats, **format_options)
+                    if schema_cache and discovered:
+                        save_cached_schema(input_path, fieldnames)
+                    return
+                if show_progress:
+                    print("Input is not NDJSON/JSON Lines; converting with a single process")
+            if fieldnames is None:
+                with _phase(stats, 'schema'):
+                    fieldnames = get_all_fieldnames(records)
+                if schema_cache:
+                    save_cached_schema(input_path, fieldnames)
+                records = open_records()
+            if output_format == 'excel':
+                with _phase(stats, 'write'):
+                    rows = write_excel(records, output_path, show_progress=show_progress,
+                                       fieldnames=fieldnames)
+            else:
+                rows = write_csv(records, output_path, delimiter, show_progress=show_progress,
+                                 fieldnames=fieldnames, stats=stats,
+                                 compression_level=compression_level, **format_options)
+            if stats is not None:
+                stats.records = rows
+        elif output_format in COLUMNAR_FORMATS:
+            # Typed columns need the whole input's types before the first batch
+            with _phase(stats, 'schema'):
+                column_types = infer_column_types(records)
+            with _phase(stats, 'write'):
+                rows = write_columnar(open_records(), output_path, column_types, output_format,
+                                      batch_size=batch_size, show_progress=show_progress)
+            if stats is not None:
+                stats.records = rows
         else:
             raise ValueError(f"Unsupported output format: {output_format}")
             
@@ -349,7 +2164,7 @@ def convert_json_to_format(
         if 'Unsupported output format' in str(e):
             raise ValueError(
                 f"{str(e)}\n"
-                "  Supported formats are: 'csv', 'tsv', 'excel'\n"
+                "  Supported formats are: 'csv', 'tsv', 'excel', 'parquet', 'arrow'\n"
                 "  Example usage: --format csv"
             )
         raise
@@ -385,22 +2200,365 @@ def convert_json_to_format(
             )
 
 
+INPUT_EXTENSIONS = ('.json', '.ndjson', '.jsonl')
+
+
+def _is_glob(pattern: str) -> bool:
+    return not os.path.exists(pattern) and any(ch in pattern for ch in '*?[')
+
+
+def _is_side_file(name: str) -> bool:
+    """True for files this converter writes next to its inputs and outputs."""
+    return name.endswith((SCHEMA_CACHE_SUFFIX, CHECKPOINT_SUFFIX, '.tmp'))
+
+
+def expand_input_paths(inputs: List[str]) -> List[str]:
+    """
+    Expand input arguments into a list of files.
+    
+    Directories contribute their .json/.ndjson/.jsonl files, also when
+    compressed (e.g. .json.gz), but are not searched recursively;
+    glob patterns their matches, and plain paths are kept as they are.
+    Schema caches, checkpoints and temporary files written by earlier
+    runs are skipped in directories and glob matches. Duplicates are
+    dropped, keeping the first occurrence.
+    
+    Args:
+        inputs: File paths, directory paths and/or glob patterns
+        
+    Returns:
+        List of input file paths in argument order
+    """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            with os.scandir(item) as entries:
+                paths.extend(sorted(
+                    entry.path for entry in entries
+                    if entry.is_file() and not _is_side_file(entry.name)
+                    and strip_compression_extension(entry.name).lower().endswith(INPUT_EXTENSIONS)
+                ))
+        elif _is_glob(item):
+            paths.extend(sorted(
+                p for p in glob.glob(item)
+                if os.path.isfile(p) and not _is_side_file(os.path.basename(p))
+            ))
+        else:
+            paths.append(item)
+    return list(dict.fromkeys(paths))
+
+
+def _output_extension(output_format: str) -> str:
+    return 'xlsx' if output_format == 'excel' else output_format
+
+
+def _convert_batch_item(task: tuple) -> Dict[str, Any]:
+    """Convert one file of a batch; errors are returned instead of raised."""
+    input_path, output_path, kwargs = task
+    start_time = time.perf_counter()
+    error = None
+    try:
+        convert_json_to_format(input_path, output_path, show_progress=False, **kwargs)
+    except Exception as e:
+        error = str(e)
+    return {
+        'input': input_path,
+        'output': output_path,
+        'bytes': os.path.getsize(input_path) if os.path.isfile(input_path) else 0,
+        'seconds': time.perf_counter() - start_time,
+        'error': error,
+    }
+
+
+def convert_json_batch(
+    input_paths: List[str],
+    output_dir: str,
+    output_format: str = 'csv',
+    jobs: int = 1,
+    show_progress: bool = True,
+    **kwargs: Any
+) -> List[Dict[str, Any]]:
+    """
+    Convert many JSON files, each to its own output file, in one process pool.
+    
+    Worker processes are started once and reused for every file, so the
+    interpreter and import cost is paid per worker rather than per file.
+    A failing file does not stop the rest of the batch.
+    
+    Args:
+        input_paths: Input JSON or NDJSON/JSON Lines files
+        output_dir: Directory for the output files (named <input stem>.<format>)
+        output_format: Output format ('csv', 'tsv', 'excel', 'parquet' or 'arrow')
+        jobs: Number of files converted in parallel
+        show_progress: Whether to show a progress bar over the files
+        **kwargs: Further options passed to convert_json_to_format()
+        
+    Returns:
+        One result per input, in input order, with 'input', 'output',
+        'bytes', 'seconds' and 'error' (None on success) keys
+    """
+    ext = _output_extension(output_format)
+    kwargs = dict(kwargs, output_format=output_format)
+    tasks = [
+        (path, os.path.join(output_dir, f"{Path(strip_compression_extension(path)).stem}.{ext}"), kwargs)
+        for path in input_paths
+    ]
+    
+    outputs = [output for _, output, _ in tasks]
+    duplicates = sorted({output for output in outputs if outputs.count(output) > 1})
+    if duplicates:
+        raise ValueError(
+            f"Several inputs would be written to the same output file: {', '.join(duplicates)}\n"
+            "  Input files in a batch need distinct names, or use --merge."
+        )
+    
+    os.makedirs(output_dir, exist_ok=True)
+    show_progress = show_progress and sys.stdout.isatty()
+    pbar = progress_bar(total=len(tasks), desc="Converting", unit="files", leave=False) if show_progress else None
+    results = {}
+    
+    try:
+        if jobs > 1 and len(tasks) > 1:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+            
+            with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+                futures = [pool.submit(_convert_batch_item, task) for task in tasks]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[result['input']] = result
+                    if pbar is not None:
+                        pbar.update(1)
+        else:
+            for task in tasks:
+                result = _convert_batch_item(task)
+                results[result['input']] = result
+                if pbar is not None:
+                    pbar.update(1)
+    finally:
+        if pbar is not None:
+            pbar.close()
+    
+    return [results[path] for path, _, _ in tasks]
+
+
+def _format_size(num_bytes: float) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
+
+
+def print_batch_summary(results: List[Dict[str, Any]], duration: float) -> None:
+    """Print per-file timings and the overall throughput of a batch conversion."""
+    width = max(len(os.path.basename(r['input'])) for r in results)
+    print()
+    for r in results:
+        name = os.path.basename(r['input'])
+        status = 'ok' if r['error'] is None else 'FAILED'
+        print(f"  {name:<{width}}  {_format_size(r['bytes']):>10}  {r['seconds']:8.2f}s  {status}")
+    
+    failed = [r for r in results if r['error'] is not None]
+    total_bytes = sum(r['bytes'] for r in results)
+    rate = duration if duration > 0 else float('inf')
+    print(f"\nConverted {len(results) - len(failed)} of {len(results)} files "
+          f"({_format_size(total_bytes)}) in {duration:.2f} seconds: "
+          f"{len(results) / rate:.1f} files/s, {_format_size(total_bytes / rate)}/s")
+    
+    for r in failed:
+        print(f"\n{os.path.basename(r['input'])}:\n{r['error']}", file=sys.stderr)
+
+
+def _start_stats(args: argparse.Namespace) -> Optional[ConversionStats]:
+    if not (args.stats or args.profile):
+        return None
+    stats = ConversionStats(track_memory=args.profile)
+    stats.start()
+    return stats
+
+
+def _status_output(args: argparse.Namespace, stats: Optional[ConversionStats]) -> TextIO:
+    """Where progress and status lines go: stderr when the JSON report goes to stdout."""
+    if stats is not None and args.stats in (None, '-'):
+        return sys.stderr
+    return sys.stdout
+
+
+def _emit_stats(stats: ConversionStats, args: argparse.Namespace,
+                inputs: List[str], output: str) -> None:
+    """Finish stats collection and write the JSON report where --stats points."""
+    stats.stop()
+    report = stats.report(
+        input=inputs[0] if len(inputs) == 1 else inputs,
+        output=output,
+        format=args.format,
+        input_bytes=sum(os.path.getsize(path) for path in inputs),
+        output_bytes=os.path.getsize(output) if os.path.isfile(output) else None,
+    )
+    text = json.dumps(report, indent=2)
+    if args.stats in (None, '-'):
+        print(text)
+    else:
+        with open(args.stats, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+
+
+def _main_batch(args: argparse.Namespace) -> int:
+    """Run main() for several inputs (directories, globs or file lists)."""
+    inputs = expand_input_paths(args.input)
+    
+    missing = [path for path in inputs if not os.path.isfile(path)]
+    if missing:
+        print(f"\nError: Input file not found: {missing[0]}", file=sys.stderr)
+        return 1
+    if not inputs:
+        print(f"\nError: No {'/'.join(INPUT_EXTENSIONS)} files found in: {' '.join(args.input)}",
+              file=sys.stderr)
+        return 1
+    
+    options = {
+        'output_format': args.format,
+        'delimiter': '\t' if args.format == 'tsv' else ',',
+        'batch_size': args.batch_size,
+        'reader': args.reader,
+        'float_format': args.float_format,
+        'bool_format': args.bool_format,
+        'date_format': args.date_format,
+        'explode_lists': args.explode_lists,
+        'parent_key': args.parent_key,
+        'compression_level': args.compression_level,
+    }
+    start_time = time.perf_counter()
+    
+    try:
+        if args.merge:
+            output = args.output or f"merged.{_output_extension(args.format)}"
+            stats = _start_stats(args)
+            with redirect_stdout(_status_output(args, stats)):
+                convert_json_to_format(inputs, output, show_progress=args.show_progress,
+                                       stats=stats, **options)
+                duration = time.perf_counter() - start_time
+                total_bytes = sum(os.path.getsize(path) for path in inputs)
+                print(f"\nSuccessfully merged {len(inputs)} files ({_format_size(total_bytes)}) "
+                      f"into {os.path.basename(output)} in {duration:.2f} seconds "
+                      f"({_format_size(total_bytes / max(duration, 1e-9))}/s)")
+            if stats is not None:
+                _emit_stats(stats, args, inputs, output)
+            return 0
+        
+        if args.stats or args.profile:
+            print("Note: --stats/--profile apply to single-file and --merge conversions; "
+                  "see the batch summary below", file=sys.stderr)
+        
+        results = convert_json_batch(
+            inputs, args.output or '.', jobs=args.jobs, show_progress=args.show_progress,
+            schema_cache=args.schema_cache, workers=args.workers,
+            incremental=args.incremental, **options
+        )
+    except (ValueError, FileNotFoundError, PermissionError, ImportError) as e:
+        print(f"\n{str(e)}", file=sys.stderr)
+        return 1
+    
+    print_batch_summary(results, time.perf_counter() - start_time)
+    return 0 if all(r['error'] is None for r in results) else 1
+
+
 def main():
     # Set up argument parser
-    parser = argparse.ArgumentParser(description='Convert JSON to various formats (CSV, TSV, Excel)')
-    parser.add_argument('input', help='Input JSON file path')
-    parser.add_argument('-o', '--output', help='Output file path (default: input.<format>)')
+    parser = argparse.ArgumentParser(description='Convert JSON to various formats (CSV, TSV, Excel, Parquet, Arrow)')
+    parser.add_argument('input', nargs='+',
+                      help='Input JSON or NDJSON/JSON Lines file path(s), directories or glob patterns')
+    parser.add_argument('-o', '--output',
+                      help='Output file path (default: input.<format>); '
+                           'the output directory when converting several files')
     parser.add_argument('-f', '--format', 
-                      choices=['csv', 'tsv', 'excel'], 
+                      choices=['csv', 'tsv', 'excel', 'parquet', 'arrow'], 
                       default='csv',
                       help='Output format (default: csv)')
     parser.add_argument('--no-progress', 
                       action='store_false', 
                       dest='show_progress',
                       help='Disable progress bars')
+    parser.add_argument('--schema-cache',
+                      action='store_true',
+                      help='Cache the discovered CSV header in <input>.schema.json and '
+                           'reuse it while the input is unchanged')
+    parser.add_argument('-w', '--workers',
+                      type=int,
+                      default=1,
+                      help='Worker processes for NDJSON to CSV/TSV conversion (default: 1)')
+    parser.add_argument('--batch-size',
+                      type=int,
+                      default=DEFAULT_BATCH_SIZE,
+                      help=f'Rows per record batch for Parquet/Arrow output (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('-j', '--jobs',
+                      type=int,
+                      default=os.cpu_count() or 1,
+                      help='Files converted in parallel when converting several files (default: CPU count)')
+    parser.add_argument('--incremental',
+                      action='store_true',
+                      help='Append only records added to an NDJSON input since the last run '
+                           '(CSV/TSV; progress is kept in <output>.checkpoint.json)')
+    parser.add_argument('--float-format',
+                      metavar='SPEC',
+                      help="CSV/TSV: format spec applied to every float, e.g. '.2f' (default: as is)")
+    parser.add_argument('--bool-format',
+                      choices=list(BOOL_FORMATS),
+                      default='python',
+                      help='CSV/TSV: write booleans as True/False, true/false or 1/0 (default: python)')
+    parser.add_argument('--date-format',
+                      metavar='PATTERN',
+                      help="CSV/TSV: strftime pattern for ISO dates, e.g. '%%d/%%m/%%Y' (default: as is)")
+    parser.add_argument('--explode-lists',
+                      action='store_true',
+                      help='CSV/TSV: write list fields to child tables <output stem>_<field>.csv '
+                           'instead of JSON strings')
+    parser.add_argument('--parent-key',
+                      metavar='FIELD',
+                      help='Field linking child table rows to their parent, e.g. id '
+                           '(default: a _row number column)')
+    parser.add_argument('--compression-level',
+                      type=int,
+                      metavar='LEVEL',
+                      help='Level for compressed CSV/TSV output (-o out.csv.gz/.bz2/.xz/.zst); '
+                           'gzip default 6, zstd default 3')
+    parser.add_argument('--reader',
+                      choices=READER_MODES,
+                      default='stream',
+                      help='Input reader: chunked reads or a memory-mapped file (default: stream)')
+    parser.add_argument('--stats',
+                      nargs='?',
+                      const='-',
+                      metavar='FILE',
+                      help='Write per-phase timings, records/sec and bytes/sec as JSON '
+                           'to FILE (default: stdout)')
+    parser.add_argument('--profile',
+                      action='store_true',
+                      help='Also record peak memory per phase with tracemalloc (slower; implies --stats)')
+    parser.add_argument('--merge',
+                      action='store_true',
+                      help='Merge several input files into one output with the union of their columns')
     
     args = parser.parse_args()
     
+    for option in ('workers', 'batch_size', 'jobs'):
+        if getattr(args, option) < 1:
+            print(f"\nError: --{option.replace('_', '-')} must be at least 1, "
+                  f"got {getattr(args, option)}", file=sys.stderr)
+            return 1
+    
+    if args.float_format is not None:
+        try:
+            format(1.5, args.float_format)
+        except ValueError as e:
+            print(f"\nError: Invalid --float-format '{args.float_format}': {e}", file=sys.stderr)
+            return 1
+    
+    if (len(args.input) > 1 or args.merge
+            or any(os.path.isdir(item) or _is_glob(item) for item in args.input)):
+        return _main_batch(args)
+    args.input = args.input[0]
+    
     # Validate input file exists and is accessible
     if not os.path.exists(args.input):
         print(f"\nError: Input file not found: {args.input}", file=sys.stderr)
@@ -430,28 +2588,44 @@ def main():
     
     # Set default output filename if not provided
     if not args.output:
-        base_name = Path(args.input).stem
-        ext = 'xlsx' if args.format == 'excel' else args.format
-        args.output = f"{base_name}.{ext}"
+        base_name = Path(strip_compression_extension(args.input)).stem
+        args.output = f"{base_name}.{_output_extension(args.format)}"
+    
+    stats = _start_stats(args)
     
     try:
-        # Get start time for duration calculation
-        import time
-        start_time = time.time()
-        
-        # Perform the conversion
-        convert_json_to_format(
-            input_path=args.input,
-            output_path=args.output,
-            output_format=args.format,
-            delimiter='\t' if args.format == 'tsv' else ',',
-            show_progress=args.show_progress
-        )
+        with redirect_stdout(_status_output(args, stats)):
+            # Get start time for duration calculation
+            start_time = time.time()
+            
+            # Perform the conversion
+            convert_json_to_format(
+                input_path=args.input,
+                output_path=args.output,
+                output_format=args.format,
+                delimiter='\t' if args.format == 'tsv' else ',',
+                show_progress=args.show_progress,
+                schema_cache=args.schema_cache,
+                workers=args.workers,
+                batch_size=args.batch_size,
+                incremental=args.incremental,
+                stats=stats,
+                reader=args.reader,
+                float_format=args.float_format,
+                bool_format=args.bool_format,
+                date_format=args.date_format,
+                explode_lists=args.explode_lists,
+                parent_key=args.parent_key,
+                compression_level=args.compression_level
+            )
+            
+            # Calculate and show duration
+            duration = time.time() - start_time
+            print(f"\nSuccessfully converted {os.path.basename(args.input)} to {os.path.basename(args.output)} "
+                  f"in {duration:.2f} seconds")
         
-        # Calculate and show duration
-        duration = time.time() - start_time
-        print(f"\nSuccessfully converted {os.path.basename(args.input)} to {os.path.basename(args.output)} "
-              f"in {duration:.2f} seconds")
+        if stats is not None:
+            _emit_stats(stats, args, [args.input], args.output)
               
     except Exception as e:
         # Don't print the full traceback for expected errors
@@ -0,0 +1,195 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import converter
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class ColumnTypeTest(unittest.TestCase):
+    def test_invalid_dates_are_strings(self):
+        self.assertEqual(converter._value_type('2023-02-28'), 'date')
+        self.assertEqual(converter._value_type('2023-02-30'), 'string')
+        self.assertEqual(converter._value_type('2023-01-01T12:30'), 'datetime')
+        self.assertEqual(converter._value_type('2023-01-01T25:00'), 'string')
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    def test_invalid_date_does_not_abort_parquet(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = os.path.join(tmp, 'input.ndjson')
+            output_path = os.path.join(tmp, 'output.parquet')
+            with open(input_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'id': 1, 'day': '2023-02-28', 'bad': '2023-02-30'}) + '\n')
+                f.write(json.dumps({'id': 2, 'day': '2023-03-01', 'bad': '2023-01-01T25:00'}) + '\n')
+            converter.convert_json_to_format(input_path, output_path, 'parquet', show_progress=False)
+            table = pq.read_table(output_path)
+        self.assertEqual(str(table.schema.field('day').type), 'date32[day]')
+        self.assertEqual(table.column('bad').to_pylist(), ['2023-02-30', '2023-01-01T25:00'])
+
+
+
+class ExpandInputPathsTest(unittest.TestCase):
+    def test_side_files_are_skipped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            names = ['a.json', 'a.json' + converter.SCHEMA_CACHE_SUFFIX,
+                     'a.csv' + converter.CHECKPOINT_SUFFIX, 'b.json.tmp']
+            for name in names:
+                open(os.path.join(tmp, name), 'w').close()
+            expected = [os.path.join(tmp, 'a.json')]
+            self.assertEqual(converter.expand_input_paths([tmp]), expected)
+            self.assertEqual(converter.expand_input_paths([os.path.join(tmp, '*')]), expected)
+
+
+def _sample_record(i):
+    record = {
+        'id': i,
+        'name': f'user "{i}", café' if i % 7 else f'line\nbreak {i}',
+        'score': i / 3 if i % 5 else None,
+        'active': i % 2 == 0,
+        'address': {'city': f'city{i % 13}', 'geo': {'lat': i * 0.5, 'lon': -i}},
+        'tags': [f't{i % 3}', {'k': i}] if i % 4 else [],
+    }
+    if i % 11 == 0:
+        record['extra'] = {'note': 'only some records have this'}
+    return record
+
+
+def _flatten_json_csv(records):
+    """The CSV the converter should produce, built with flatten_json and csv.DictWriter."""
+    rows = [converter.flatten_json(record) for record in records]
+    out = io.StringIO(newline='')
+    writer = csv.DictWriter(out, sorted({key for row in rows for key in row}))
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
+
+
+class EquivalenceTest(unittest.TestCase):
+    """Every reader and the parallel writer produce the same CSV as flatten_json."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        # Over the 1 MB minimum shard size, so --workers splits the input
+        cls.records = [_sample_record(i) for i in range(12_000)]
+        cls.ndjson_path = os.path.join(cls.tmp.name, 'input.ndjson')
+        with open(cls.ndjson_path, 'w', encoding='utf-8') as f:
+            for record in cls.records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        cls.array_path = os.path.join(cls.tmp.name, 'input.json')
+        with open(cls.array_path, 'w', encoding='utf-8') as f:
+            json.dump(cls.records, f, ensure_ascii=False, indent=1)
+        cls.expected = _flatten_json_csv(cls.records)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def convert(self, input_path, name, **options):
+        output_path = os.path.join(self.tmp.name, name)
+        converter.convert_json_to_format(input_path, output_path, show_progress=False, **options)
+        return output_path
+
+    def read(self, path):
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return f.read()
+
+    def test_readers_match_flatten_json(self):
+        for input_path in (self.ndjson_path, self.array_path):
+            for reader in ('stream', 'mmap'):
+                with self.subTest(input=os.path.basename(input_path), reader=reader):
+                    output_path = self.convert(input_path, f'{reader}.csv', reader=reader)
+                    self.assertEqual(self.read(output_path), self.expected)
+
+    def test_parallel_matches_flatten_json(self):
+        output_path = self.convert(self.ndjson_path, 'parallel.csv', workers=2)
+        self.assertGreater(os.path.getsize(self.ndjson_path), 1024 * 1024)
+        self.assertEqual(self.read(output_path), self.expected)
+
+    def test_outputs_are_byte_identical(self):
+        options = {'float_format': '.3f', 'bool_format': 'int', 'delimiter': '\t'}
+        outputs = []
+        for name, extra in (('stream', {}), ('mmap', {'reader': 'mmap'}), ('parallel', {'workers': 2})):
+            with open(self.convert(self.ndjson_path, f'{name}.tsv', **options, **extra), 'rb') as f:
+                outputs.append(f.read())
+        self.assertEqual(outputs[1], outputs[0])
+        self.assertEqual(outputs[2], outputs[0])
+
+
+class ReaderTest(unittest.TestCase):
+    def test_every_pass_uses_the_requested_reader(self):
+        formats = [('csv', {}), ('csv', {'explode_lists': True})]
+        if pq is not None:
+            formats.append(('parquet', {}))
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = os.path.join(tmp, 'input.ndjson')
+            with open(input_path, 'w', encoding='utf-8') as f:
+                f.write('{"id": 1, "tags": ["a", "b"]}\n{"id": 2, "tags": []}\n')
+            for output_format, options in formats:
+                output_path = os.path.join(tmp, f'output.{output_format}')
+                with mock.patch.object(converter, 'iter_json_records',
+                                       wraps=converter.iter_json_records) as spy:
+                    converter.convert_json_to_format(input_path, output_path, output_format,
+                                                     show_progress=False, reader='mmap', **options)
+                readers = [call.kwargs['reader'] for call in spy.call_args_list]
+                self.assertGreaterEqual(len(readers), 2)
+                self.assertEqual(set(readers), {'mmap'}, (output_format, options))
+
+
+class IncrementalTest(unittest.TestCase):
+    def test_failed_append_keeps_earlier_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = os.path.join(tmp, 'input.ndjson')
+            output_path = os.path.join(tmp, 'output.csv')
+            with open(input_path, 'w', encoding='utf-8') as f:
+                f.write('{"id": 1}\n{"id": 2}\n')
+            converter.write_csv_incremental(input_path, output_path)
+            with open(output_path, 'rb') as f:
+                before = f.read()
+            with open(output_path + converter.CHECKPOINT_SUFFIX, 'rb') as f:
+                checkpoint = f.read()
+
+            with open(input_path, 'a', encoding='utf-8') as f:
+                f.write('{"id": 3}\n{"id": 4}\n')
+            write_records = converter.CsvBlockWriter.write_records
+
+            def fail_after_writing(writer, data):
+                write_records(writer, data)
+                raise OSError(28, 'No space left on device')
+
+            with mock.patch.object(converter.CsvBlockWriter, 'write_records', fail_after_writing):
+                with self.assertRaises(Exception):
+                    converter.write_csv_incremental(input_path, output_path)
+
+            with open(output_path, 'rb') as f:
+                self.assertEqual(f.read(), before)
+            with open(output_path + converter.CHECKPOINT_SUFFIX, 'rb') as f:
+                self.assertEqual(f.read(), checkpoint)
+
+    def test_run_without_new_records_reads_nothing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = os.path.join(tmp, 'input.ndjson')
+            output_path = os.path.join(tmp, 'output.csv')
+            with open(input_path, 'w', encoding='utf-8') as f:
+                f.write('{"id": 1}\n{"id": 2}\n')
+            converter.write_csv_incremental(input_path, output_path)
+
+            stats = converter.ConversionStats()
+            stats.start()
+            converter.write_csv_incremental(input_path, output_path, stats=stats)
+            stats.stop()
+            report = stats.report(input_bytes=os.path.getsize(input_path))
+            self.assertEqual(report['bytes_read'], 0)
+            self.assertEqual(report['bytes_per_sec'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,36 +1,650 @@
+import argparse
+import codecs
+import heapq
+import io
+import math
+import os
+import random
+import re
+import sqlite3
 import string
+import sys
+import time
+import tracemalloc
+from array import array
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
+CHUNK_SIZE = 1 << 20  # characters read per chunk when streaming a file
+PARALLEL_MIN_SIZE = 64 << 20  # files at least this large are analyzed in parallel
+INDEX_FILE = ".text_index.sqlite"
+CORPUS_EXTENSIONS = (".txt", ".md", ".rst", ".log")
 
-def analyze_text(text):
-    """Analyze text and return stats including word frequency, reading time, etc."""
+
+_MASK64 = (1 << 64) - 1
+
+
+class CountMinSketch:
+    """
+    Count-Min Sketch: estimated counts are never too low, and too high by at
+    most error * total with probability `confidence`.
+    """
+
+    def __init__(self, error=0.001, confidence=0.99):
+        self.width = math.ceil(math.e / error)
+        self.depth = math.ceil(math.log(1 / (1 - confidence)))
+        self.rows = [array("Q", bytes(8 * self.width)) for _ in range(self.depth)]
+
+    def _columns(self, h):
+        # Row i uses h1 + i * h2 (double hashing) instead of i independent hashes
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        width = self.width
+        return [(h1 + i * h2) % width for i in range(self.depth)]
+
+    def add(self, h, count=1):
+        """Count an item by its 64-bit hash and return its new estimate."""
+        estimate = None
+        for column, row in zip(self._columns(h), self.rows):
+            row[column] += count
+            if estimate is None or row[column] < estimate:
+                estimate = row[column]
+        return estimate
+
+    def estimate(self, h):
+        return min(row[column] for column, row in zip(self._columns(h), self.rows))
+
+    def memory_bytes(self):
+        return 8 * self.width * self.depth
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters: tracks at most `capacity` items; a tracked
+    count is too high by at most total / capacity.
+    """
+
+    # Per tracked item: dict slot and count, heap tuple, and a typical word
+    ENTRY_BYTES = 100 + sys.getsizeof((0, "")) + sys.getsizeof("x" * 8)
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.heap = []  # one (count, item) entry per item, possibly stale
+
+    def add(self, item, count=1):
+        counts = self.counts
+        if item in counts:
+            counts[item] += count
+        elif len(counts) < self.capacity:
+            counts[item] = count
+            heapq.heappush(self.heap, (count, item))
+        else:
+            # Replace the item with the smallest count; stale entries are
+            # refreshed on the way
+            while True:
+                smallest, victim = heapq.heappop(self.heap)
+                if counts[victim] == smallest:
+                    break
+                heapq.heappush(self.heap, (counts[victim], victim))
+            del counts[victim]
+            counts[item] = smallest + count
+            heapq.heappush(self.heap, (smallest + count, item))
+
+    def min_count(self):
+        """Smallest tracked count (once the table is full)."""
+        heap, counts = self.heap, self.counts
+        while counts[heap[0][1]] != heap[0][0]:
+            heapq.heapreplace(heap, (counts[heap[0][1]], heap[0][1]))
+        return heap[0][0]
+
+    def memory_bytes(self):
+        return self.capacity * self.ENTRY_BYTES
+
+
+class HyperLogLog:
+    """HyperLogLog distinct count with relative standard error of about `error`."""
+
+    def __init__(self, error=0.01):
+        self.p = min(18, max(4, math.ceil(math.log2((1.04 / error) ** 2))))
+        self.m = 1 << self.p
+        self.registers = bytearray(self.m)
+
+    def add(self, h):
+        """Add an item by its 64-bit hash."""
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = 64 - self.p - rest.bit_length() + 1
+        index = h >> (64 - self.p)
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def __len__(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting for small sets
+        return round(estimate)
+
+    def memory_bytes(self):
+        return self.m
+
+
+class ApproxCounter:
+    """
+    Drop-in for the word Counter in approximate mode, with bounded memory.
+
+    Heavy hitters come from Space-Saving, their counts from the tighter of
+    Space-Saving and a Count-Min Sketch, and len() from HyperLogLog. Word
+    hashes use Python's hash(), so sketches are only comparable within one
+    process.
+
+    Args:
+        error: Count error bound, as a fraction of the total word count
+        confidence: Probability that the Count-Min bound holds
+        capacity: Most words tracked as top-word candidates (default: 2 / error)
+        distinct_error: Relative standard error of the distinct-word count
+        max_memory: Cap in bytes on the sketches; capacity is lowered to fit
+            what the Count-Min Sketch and HyperLogLog leave
+    """
+
+    def __init__(self, error=0.001, confidence=0.99, capacity=None, distinct_error=0.01,
+                 max_memory=None):
+        self.total = 0
+        self.sketch = CountMinSketch(error, confidence)
+        self.distinct = HyperLogLog(distinct_error)
+        capacity = capacity or math.ceil(2 / error)
+        if max_memory is not None:
+            fixed = self.sketch.memory_bytes() + self.distinct.memory_bytes()
+            fitting = (max_memory - fixed) // SpaceSaving.ENTRY_BYTES
+            if fitting < 1:
+                raise ValueError(f"max_memory of {max_memory} bytes leaves no room for top words: "
+                                 f"the count and distinct sketches take {fixed} bytes "
+                                 "(raise error or distinct_error to shrink them)")
+            capacity = min(capacity, fitting)
+        self.heavy = SpaceSaving(capacity)
+
+    def update(self, words):
+        """Count an iterable of words (or a mapping of word counts)."""
+        # Pre-aggregating each batch with a Counter runs in C and leaves
+        # one sketch update per distinct word instead of one per word
+        batch = Counter(words)
+        sketch_add, heavy_add, distinct_add = self.sketch.add, self.heavy.add, self.distinct.add
+        tracked, capacity = self.heavy.counts, self.heavy.capacity
+        smallest = 0
+        for word, count in batch.items():
+            h = hash(word) & _MASK64
+            estimate = sketch_add(h, count)
+            distinct_add(h)
+            # A word whose (over)estimate does not beat the smallest tracked
+            # count cannot be a heavy hitter; skipping it avoids evictions
+            if word in tracked or len(tracked) < capacity:
+                heavy_add(word, count)
+            elif estimate > smallest and estimate > (smallest := self.heavy.min_count()):
+                heavy_add(word, count)
+        self.total += sum(batch.values())
+
+    def __getitem__(self, word):
+        return self.sketch.estimate(hash(word) & _MASK64)
+
+    def __len__(self):
+        return len(self.distinct)
+
+    def most_common(self, n=None):
+        estimate = self.sketch.estimate
+        items = [(word, min(count, estimate(hash(word) & _MASK64)))
+                 for word, count in self.heavy.counts.items()]
+        items.sort(key=lambda item: (-item[1], item[0]))
+        return items[:n]
+
+    def memory_bytes(self):
+        return self.sketch.memory_bytes() + self.heavy.memory_bytes() + self.distinct.memory_bytes()
+
+
+def _summarize(word_count, char_count, char_no_spaces, sentence_count, paragraph_count, counter):
+    """Build the analyze_text() stats dict from raw counts."""
+    return {
+        "word_count": word_count,
+        "char_count": char_count,
+        "char_no_spaces": char_no_spaces,
+        "sentence_count": sentence_count or 1,
+        "paragraph_count": paragraph_count,
+        "avg_word_length": round(char_no_spaces / word_count, 2) if word_count else 0,
+        "reading_time": round(word_count / 200, 1),  # ~200 wpm average
+        "speaking_time": round(word_count / 130, 1),  # ~130 wpm average
+        "top_words": counter.most_common(10),
+        "distinct_words": len(counter),
+    }
+
+
+def _count_chunks(chunks, counter=None):
+    """
+    Raw counts over an iterable of text chunks, in constant memory.
+
+    Words and "\n\n" paragraph breaks that span two chunks are carried over
+    to the next one. Returns a dict of counts (see _merge_counts); the
+    paragraphs entry is (first, middle, last): whether the text before the
+    first break is non-blank (None without any break), the number of
+    non-blank pieces between breaks, and whether the text after the last
+    break is non-blank, so counts of consecutive pieces of text can be
+    merged. `counter` may be an ApproxCounter instead of a Counter.
+    """
+    word_count = char_count = spaces = sentence_count = middle = 0
+    if counter is None:
+        counter = Counter()
+    partial_word = ""  # unfinished word at the end of the last chunk
+    newline = ""  # a trailing "\n" that may start a "\n\n" break
+    first = None
+    in_paragraph = False  # current paragraph has non-whitespace text
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        char_count += len(chunk)
+        spaces += chunk.count(" ")
+
+        # Paragraphs: text.split("\n\n") pieces that are not blank
+        parts = (newline + chunk).split("\n\n")
+        for part in parts[:-1]:
+            nonblank = in_paragraph or bool(part.strip())
+            if first is None:
+                first = nonblank
+            else:
+                middle += nonblank
+            in_paragraph = False
+        last = parts[-1]
+        newline = "\n" if last.endswith("\n") else ""
+        in_paragraph = in_paragraph or bool(last.strip())
+
+        # Lowercase only whole words: str.lower() turns a word-final sigma
+        # into "ς", which depends on whether the word goes on
+        text = partial_word + chunk
+        partial_word = ""
+        if not chunk[-1].isspace():
+            *head, partial_word = text.rsplit(None, 1)
+            text = head[0] if head else ""
+        words = text.lower().split()
+        word_count += len(words)
+        sentence_count += count_words(words, counter)
+
+    if partial_word:
+        word_count += 1
+        sentence_count += count_words([partial_word.lower()], counter)
+
+    return {
+        "word_count": word_count,
+        "char_count": char_count,
+        "spaces": spaces,
+        "sentence_count": sentence_count,
+        "paragraphs": (first, middle, in_paragraph),
+        "counter": counter,
+    }
+
+
+def _merge_counts(parts):
+    """
+    Combine _count_chunks() results of consecutive pieces of text into the
+    analyze_text() stats dict of the whole text.
+
+    Pieces must be cut where no word and no "\n\n" spans the cut. Counters
+    are added in text order, so ties in top_words keep the first-seen order
+    that Counter.most_common() gives on the whole text.
+    """
+    word_count = char_count = spaces = sentence_count = paragraph_count = 0
+    counter = None
+    in_paragraph = False
+    for part in parts:
+        word_count += part["word_count"]
+        char_count += part["char_count"]
+        spaces += part["spaces"]
+        sentence_count += part["sentence_count"]
+        if counter is None:
+            counter = part["counter"]
+        else:
+            counter.update(part["counter"])
+        first, middle, last = part["paragraphs"]
+        if first is None:
+            in_paragraph = in_paragraph or last
+        else:
+            paragraph_count += (in_paragraph or first) + middle
+            in_paragraph = last
+    paragraph_count += in_paragraph
+    return _summarize(word_count, char_count, char_count - spaces, sentence_count,
+                      paragraph_count, Counter() if counter is None else counter)
+
+
+def analyze_chunks(chunks, approximate=False, **sketch_options):
+    """
+    Same stats as analyze_text(), computed over an iterable of text chunks.
+
+    Only running counts are kept (plus the word counter), so memory does not
+    grow with the input.
+    """
+    counter = ApproxCounter(**sketch_options) if approximate else None
+    return _merge_counts([_count_chunks(chunks, counter)])
+
+
+def _text_chunks(text, chunk_size=CHUNK_SIZE):
+    """Slices of about chunk_size characters, each ending just after whitespace."""
+    start = 0
+    while start < len(text):
+        match = _WHITESPACE.search(text, start + chunk_size)
+        end = match.end() if match else len(text)
+        yield text[start:end]
+        start = end
+
+
+_WHITESPACE = re.compile(r"\s")
+
+
+def analyze_file(path, chunk_size=CHUNK_SIZE, approximate=False, **sketch_options):
+    """Analyze a file of any size by streaming it in chunks."""
+    with open(path, "r", encoding="utf-8") as f:
+        return analyze_chunks(iter(lambda: f.read(chunk_size), ""), approximate, **sketch_options)
+
+
+# A space or tab not followed by a line break: no word and no "\n\n" spans it
+_SAFE_CUT = re.compile(rb"[ \t](?=[^\r\n])")
+
+
+def split_ranges(path, parts):
+    """Split a file into about `parts` byte ranges that end at whitespace."""
+    size = os.path.getsize(path)
+    cuts = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            offset = max(size * i // parts, cuts[-1])
+            f.seek(offset)
+            match = _SAFE_CUT.search(f.read(CHUNK_SIZE))
+            if match and offset + match.end() < size:
+                cuts.append(offset + match.end())
+    cuts.append(size)
+    return [(start, end) for start, end in zip(cuts, cuts[1:]) if end > start]
+
+
+def _read_range(path, start, end):
+    """Decode a byte range of a UTF-8 file in chunks, with universal newlines."""
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(), translate=True)
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            data = f.read(min(CHUNK_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield decoder.decode(data, final=remaining <= 0)
+
+
+def _count_range(task):
+    path, start, end = task
+    return _count_chunks(_read_range(path, start, end))
+
+
+def analyze_file_parallel(path, workers=None):
+    """
+    Analyze a file with a pool of worker processes (map-reduce).
+
+    The file is cut into byte ranges at whitespace, each range is counted in
+    a worker, and the partial counts are merged in file order, so the result
+    is identical to analyze_file(), top_words ties included.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = split_ranges(path, workers * 4)
+    if workers == 1 or len(ranges) == 1:
+        return _merge_counts([_count_range((path, start, end)) for start, end in ranges])
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _merge_counts(pool.map(_count_range, [(path, start, end) for start, end in ranges]))
+
+
+def count_words(words, counter):
+    """
+    Add already-lowercased words to counter, stripped of punctuation, and
+    return the number of sentence-ending marks (".", "!", "?") in them.
+
+    Tokens are counted as they are (a C loop) and only each distinct token
+    is stripped, instead of stripping every word. Lowercasing before
+    stripping gives the same words: no character lowercases to or from
+    punctuation or whitespace. Every sentence mark is inside some token, so
+    they are counted from the same table instead of in passes over the
+    text. First-seen order, and so the order of ties in most_common(), is
+    preserved.
+    """
+    punctuation = string.punctuation
+    cleaned = Counter()
+    sentence_marks = 0
+    for token, count in Counter(words).items():
+        word = token.strip(punctuation)
+        if word:
+            cleaned[word] += count
+        if word != token or not word.isalnum():
+            sentence_marks += count * (token.count(".") + token.count("!") + token.count("?"))
+    counter.update(cleaned)
+    return sentence_marks
+
+
+def analyze_text(text, approximate=False, **sketch_options):
+    """
+    Analyze text and return stats including word frequency, reading time, etc.
+
+    With approximate=True, top_words and distinct_words come from bounded-
+    memory sketches (see ApproxCounter for the options, max_memory among
+    them) instead of an exact Counter over every distinct word, and the text
+    is counted in CHUNK_SIZE slices so no per-word structure outgrows one
+    slice.
+    """
+    if approximate:
+        return analyze_chunks(_text_chunks(text), approximate=True, **sketch_options)
+    words = text.lower().split()
+    counter = Counter()
+    sentence_count = count_words(words, counter)
+    char_count = len(text)
+    paragraph_count = len(list(filter(str.strip, text.split("\n\n"))))
+    return _summarize(len(words), char_count, char_count - text.count(" "),
+                      sentence_count, paragraph_count, counter)
+
+
+def _analyze_text_reference(text):
+    """The original, word-by-word analyze_text(), kept for bench-tokenizer."""
     words = text.split()
     word_count = len(words)
     char_count = len(text)
     char_no_spaces = len(text.replace(" ", ""))
-    sentence_count = sum(text.count(p) for p in ".!?") or 1
+    sentence_count = sum(text.count(p) for p in ".!?")
     paragraph_count = len([p for p in text.split("\n\n") if p.strip()])
-    avg_word_length = round(char_no_spaces / word_count, 2) if word_count else 0
-    reading_time_min = round(word_count / 200, 1)  # ~200 wpm average
-    speaking_time_min = round(word_count / 130, 1)  # ~130 wpm average
 
     # Word frequency (cleaned, lowercase)
     cleaned_words = [
         w.strip(string.punctuation).lower() for w in words if w.strip(string.punctuation)
     ]
-    frequency = Counter(cleaned_words).most_common(10)
 
-    return {
-        "word_count": word_count,
-        "char_count": char_count,
-        "char_no_spaces": char_no_spaces,
-        "sentence_count": sentence_count,
-        "paragraph_count": paragraph_count,
-        "avg_word_length": avg_word_length,
-        "reading_time": reading_time_min,
-        "speaking_time": speaking_time_min,
-        "top_words": frequency,
-    }
+    return _summarize(word_count, char_count, char_no_spaces, sentence_count,
+                      paragraph_count, Counter(cleaned_words))
+
+
+def normalize_term(word):
+    """Clean a word into an index term; queries go through this too."""
+    return word.strip(string.punctuation).lower()
+
+
+def _index_terms(words):
+    """Map each cleaned term to the word positions where it occurs."""
+    positions = {}
+    for i, w in enumerate(words):
+        term = normalize_term(w)
+        if term:
+            positions.setdefault(term, []).append(i)
+    return positions
+
+
+def open_index(directory):
+    """Open (or create) the inverted index stored in a corpus directory."""
+    conn = sqlite3.connect(os.path.join(directory, INDEX_FILE))
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS documents (
+            id INTEGER PRIMARY KEY,
+            path TEXT UNIQUE NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            word_count INTEGER, char_count INTEGER, char_no_spaces INTEGER,
+            sentence_count INTEGER, paragraph_count INTEGER, avg_word_length REAL
+        );
+        -- positions: word offsets as a packed array of unsigned ints
+        CREATE TABLE IF NOT EXISTS postings (
+            term TEXT NOT NULL,
+            doc_id INTEGER NOT NULL,
+            tf INTEGER NOT NULL,
+            positions BLOB NOT NULL,
+            PRIMARY KEY (term, doc_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+        -- df/cf per term, kept up to date so top-k never scans the postings
+        CREATE TABLE IF NOT EXISTS terms (
+            term TEXT PRIMARY KEY,
+            df INTEGER NOT NULL,
+            cf INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS terms_cf ON terms (cf);
+    """)
+    return conn
+
+
+def _remove_document(conn, doc_id):
+    conn.execute("""
+        UPDATE terms SET df = df - 1,
+            cf = cf - (SELECT tf FROM postings WHERE postings.term = terms.term AND doc_id = ?)
+        WHERE term IN (SELECT term FROM postings WHERE doc_id = ?)
+    """, (doc_id, doc_id))
+    conn.execute("DELETE FROM terms WHERE df = 0")
+    conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+    conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+
+def _add_document(conn, path, mtime_ns, text):
+    stats = analyze_text(text)
+    cur = conn.execute(
+        "INSERT INTO documents (path, mtime_ns, word_count, char_count, char_no_spaces,"
+        " sentence_count, paragraph_count, avg_word_length) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (path, mtime_ns, stats["word_count"], stats["char_count"], stats["char_no_spaces"],
+         stats["sentence_count"], stats["paragraph_count"], stats["avg_word_length"]),
+    )
+    doc_id = cur.lastrowid
+    postings = _index_terms(text.split())
+    conn.executemany(
+        "INSERT INTO postings (term, doc_id, tf, positions) VALUES (?, ?, ?, ?)",
+        ((term, doc_id, len(pos), array("I", pos).tobytes()) for term, pos in postings.items()),
+    )
+    conn.executemany(
+        "INSERT INTO terms (term, df, cf) VALUES (?, 1, ?)"
+        " ON CONFLICT (term) DO UPDATE SET df = df + 1, cf = cf + excluded.cf",
+        ((term, len(pos)) for term, pos in postings.items()),
+    )
+
+
+def index_corpus(directory, extensions=CORPUS_EXTENSIONS):
+    """
+    Index every text file under a directory, skipping files unchanged since
+    the last run (same mtime). Returns (indexed, removed, unchanged) counts.
+    """
+    conn = open_index(directory)
+    known = {path: (doc_id, mtime) for doc_id, path, mtime
+             in conn.execute("SELECT id, path, mtime_ns FROM documents")}
+    indexed = unchanged = 0
+
+    with conn:
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for name in files:
+                if not name.lower().endswith(extensions):
+                    continue
+                full = os.path.join(root, name)
+                path = os.path.relpath(full, directory)
+                mtime_ns = os.stat(full).st_mtime_ns
+                doc_id, old_mtime = known.pop(path, (None, None))
+                if old_mtime == mtime_ns:
+                    unchanged += 1
+                    continue
+                if doc_id is not None:
+                    _remove_document(conn, doc_id)
+                with open(full, "r", encoding="utf-8", errors="replace") as f:
+                    _add_document(conn, path, mtime_ns, f.read())
+                indexed += 1
+
+        # Whatever is left was deleted from the directory
+        for doc_id, _ in known.values():
+            _remove_document(conn, doc_id)
+
+    conn.close()
+    return indexed, len(known), unchanged
+
+
+def corpus_top_words(conn, k=10):
+    """The k most frequent terms over the whole corpus, as (term, count) pairs."""
+    return conn.execute("SELECT term, cf FROM terms ORDER BY cf DESC, term LIMIT ?", (k,)).fetchall()
+
+
+def document_frequency(conn, term):
+    """Number of documents containing term."""
+    row = conn.execute("SELECT df FROM terms WHERE term = ?", (normalize_term(term),)).fetchone()
+    return row[0] if row else 0
+
+
+def tf_idf(conn, term, k=10):
+    """The k documents scoring highest for term, as (path, tf-idf score) pairs."""
+    term = normalize_term(term)
+    total = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+    df = document_frequency(conn, term)
+    if not df:
+        return []
+    idf = math.log(total / df)
+    rows = conn.execute(
+        "SELECT d.path, p.tf, d.word_count FROM postings p JOIN documents d ON d.id = p.doc_id"
+        " WHERE p.term = ?", (term,)
+    )
+    scores = [(path, round(tf / word_count * idf, 6)) for path, tf, word_count in rows]
+    scores.sort(key=lambda item: (-item[1], item[0]))
+    return scores[:k]
+
+
+def term_positions(conn, term, path):
+    """Word offsets of term in one document."""
+    row = conn.execute(
+        "SELECT p.positions FROM postings p JOIN documents d ON d.id = p.doc_id"
+        " WHERE p.term = ? AND d.path = ?", (normalize_term(term), path)
+    ).fetchone()
+    return array("I", row[0]).tolist() if row else []
+
+
+def corpus_main(directory):
+    """Index a directory, then answer queries interactively."""
+    if not os.path.isdir(directory):
+        print(f"Error: '{directory}' is not a valid directory.")
+        return
+
+    indexed, removed, unchanged = index_corpus(directory)
+    print(f"\nIndexed {indexed} file(s), removed {removed}, {unchanged} unchanged.")
+
+    conn = open_index(directory)
+    docs, words = conn.execute("SELECT COUNT(*), COALESCE(SUM(word_count), 0) FROM documents").fetchone()
+    print(f"Corpus: {docs} document(s), {words} words.\n")
+    print("Queries: top [k] | df <term> | tfidf <term> | quit")
+
+    while True:
+        query = input("> ").strip().split()
+        if not query or query[0] == "quit":
+            break
+        command, args = query[0], query[1:]
+        if command == "top":
+            k = int(args[0]) if args and args[0].isdigit() else 10
+            for term, count in corpus_top_words(conn, k):
+                print(f"    {term:20s} {count}")
+        elif command == "df" and args:
+            print(f"    {args[0]} appears in {document_frequency(conn, args[0])} document(s)")
+        elif command == "tfidf" and args:
+            for path, score in tf_idf(conn, args[0]):
+                print(f"    {score:<10} {path}")
+        else:
+            print("Unknown query.")
+    conn.close()
 
 
 def display_results(stats):
@@ -41,6 +655,7 @@ def display_results(stats):
     print(f"  Characters (no spaces): {stats['char_no_spaces']}")
     print(f"  Sentences:        {stats['sentence_count']}")
     print(f"  Paragraphs:       {stats['paragraph_count']}")
+    print(f"  Distinct words:   {stats['distinct_words']}")
     print(f"  Avg word length:  {stats['avg_word_length']} chars")
     print(f"  Reading time:     {stats['reading_time']} min")
     print(f"  Speaking time:    {stats['speaking_time']} min")
@@ -57,16 +672,26 @@ def main():
     print("#####################################")
     print()
 
-    choice = input("Analyze (1) text input or (2) a file? [1/2]: ").strip()
+    choice = input("Analyze (1) text input, (2) a file or (3) a directory of files? [1/2/3]: ").strip()
 
-    if choice == "2":
+    if choice == "3":
+        corpus_main(input("Enter directory path: ").strip())
+        return
+    elif choice == "2":
         path = input("Enter file path: ").strip()
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                text = f.read()
+            if os.path.getsize(path) >= PARALLEL_MIN_SIZE:
+                stats = analyze_file_parallel(path)
+            else:
+                stats = analyze_file(path)
         except FileNotFoundError:
             print(f"Error: '{path}' not found.")
             return
+        if not stats["word_count"]:
+            print("No text provided.")
+            return
+        display_results(stats)
+        return
     else:
         print("Enter your text (press Enter twice to finish):")
         lines = []
@@ -85,5 +710,135 @@ def main():
     display_results(stats)
 
 
+def bench_parallel(args):
+    """Time analyze_file_parallel() with 1..N workers against analyze_file()."""
+    start = time.perf_counter()
+    expected = analyze_file(args.file)
+    serial = time.perf_counter() - start
+    size_mb = os.path.getsize(args.file) / (1 << 20)
+    print(f"{'workers':>8} {'seconds':>9} {'MB/s':>8} {'speedup':>8}")
+    print(f"{'serial':>8} {serial:9.2f} {size_mb / serial:8.1f} {1:8.2f}")
+    for workers in range(1, args.max_workers + 1):
+        start = time.perf_counter()
+        stats = analyze_file_parallel(args.file, workers)
+        seconds = time.perf_counter() - start
+        match = "" if stats == expected else "  MISMATCH"
+        print(f"{workers:>8} {seconds:9.2f} {size_mb / seconds:8.1f} {serial / seconds:8.2f}{match}")
+
+
+def _measure(fn, *args, **kwargs):
+    """Run fn twice, returning (result, seconds, peak traced memory in bytes)."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    # tracemalloc slows allocations down, so memory is measured separately
+    tracemalloc.start()
+    fn(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def bench_approx(args):
+    """Validate approximate mode against the exact path on a corpus."""
+    options = {"error": args.error, "confidence": args.confidence,
+               "capacity": args.capacity, "distinct_error": args.distinct_error,
+               "max_memory": args.max_memory and int(args.max_memory * 1e6)}
+    exact, exact_s, exact_mem = _measure(analyze_file, args.file)
+    approx, approx_s, approx_mem = _measure(analyze_file, args.file, approximate=True, **options)
+
+    total = exact["word_count"]
+    counter = ApproxCounter(**options)
+    print(f"Words: {total}, distinct: {exact['distinct_words']}")
+    print(f"{'':8}{'seconds':>10}{'peak MB':>10}")
+    print(f"{'exact':8}{exact_s:10.2f}{exact_mem / 1e6:10.1f}")
+    print(f"{'approx':8}{approx_s:10.2f}{approx_mem / 1e6:10.1f}"
+          f"   (sketches: {counter.memory_bytes() / 1e6:.1f} MB)")
+
+    distinct_error = approx["distinct_words"] / max(exact["distinct_words"], 1) - 1
+    print(f"\nDistinct words: {approx['distinct_words']} ({distinct_error:+.2%}, "
+          f"standard error {args.distinct_error:.2%})")
+
+    exact_counts = dict(exact["top_words"])
+    bound = args.error * total
+    print(f"\nTop 10 (count bound: +{bound:.0f} = {args.error} x {total} words)")
+    print(f"  {'exact':28}{'approximate':28}")
+    for (word, count), (approx_word, approx_count) in zip(exact["top_words"], approx["top_words"]):
+        print(f"  {word:20}{count:>8}{approx_word:>20}{approx_count:>8}")
+    missed = [word for word in exact_counts if word not in dict(approx["top_words"])]
+    print(f"\nTop words missed: {len(missed)}"
+          + (f" ({', '.join(missed)})" if missed else ""))
+
+
+def _synthetic_corpus(size_mb, seed=0):
+    """Zipf-distributed words with punctuation, sentences and paragraphs."""
+    rng = random.Random(seed)
+    vocab = [f"word{i}" for i in range(50000)] + ["The", "a", "and", "of", "to"]
+    weights = [1 / (i + 1) for i in range(len(vocab))]
+    endings = ["", "", "", "", ",", ".", "!", "?", ";", "\""]
+    parts = []
+    size = 0
+    while size < size_mb << 20:
+        words = rng.choices(vocab, weights, k=1000)
+        tails = rng.choices(endings, k=1000)
+        paragraph = " ".join(w + t for w, t in zip(words, tails)) + "\n\n"
+        parts.append(paragraph)
+        size += len(paragraph)
+    return "".join(parts)
+
+
+def bench_tokenizer(args):
+    """Time analyze_text() against the original word-by-word implementation."""
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = _synthetic_corpus(args.size_mb)
+    size_mb = len(text) / (1 << 20)
+    results = {}
+    for name, fn in (("reference", _analyze_text_reference), ("analyze_text", analyze_text)):
+        best = None
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            results[name] = fn(text)
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+        print(f"{name:14}{best:8.2f} s {size_mb / best:8.1f} MB/s")
+    same = results["reference"] == results["analyze_text"]
+    print(f"Identical results: {same}")
+
+
+def bench_main(argv):
+    parser = argparse.ArgumentParser(description="Text Analyzer benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    parallel = sub.add_parser("bench-parallel", help="Scaling of the parallel analyzer from 1 to N cores")
+    parallel.add_argument("file", help="Text file to analyze")
+    parallel.add_argument("--max-workers", type=int, default=os.cpu_count() or 1,
+                          help="Largest pool size to try (default: CPU count)")
+    parallel.set_defaults(func=bench_parallel)
+    approx = sub.add_parser("bench-approx", help="Compare approximate mode against the exact path")
+    approx.add_argument("file", help="Text corpus to analyze")
+    approx.add_argument("--error", type=float, default=0.001,
+                        help="Count error bound as a fraction of all words (default: 0.001)")
+    approx.add_argument("--confidence", type=float, default=0.99,
+                        help="Probability the count bound holds (default: 0.99)")
+    approx.add_argument("--capacity", type=int, help="Most words tracked (default: 2 / error)")
+    approx.add_argument("--distinct-error", type=float, default=0.01,
+                        help="Standard error of the distinct-word count (default: 0.01)")
+    approx.add_argument("--max-memory", type=float, metavar="MB",
+                        help="Cap on the sketches' memory; lowers --capacity to fit")
+    approx.set_defaults(func=bench_approx)
+    tokenizer = sub.add_parser("bench-tokenizer", help="analyze_text() against the original implementation")
+    tokenizer.add_argument("file", nargs="?", help="Text file (default: a synthetic corpus)")
+    tokenizer.add_argument("--size-mb", type=int, default=100, help="Synthetic corpus size (default: 100)")
+    tokenizer.add_argument("--runs", type=int, default=3, help="Best of N runs (default: 3)")
+    tokenizer.set_defaults(func=bench_tokenizer)
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        bench_main(sys.argv[1:])
+    else:
+        main()
@@ -1,44 +1,565 @@
-def justify_text(text, width):
-    words = text.split()
-    lines = []
-    current_line = words[0]
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import unicodedata
+from array import array
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+CACHE_FILE = ".justify_cache.sqlite"
+CACHE_SIZE = 100_000  # paragraphs kept in the layout cache
+BATCH_SIZE = 256  # paragraphs per worker task
+
+# Display width by code point, as runs: _WIDTH_STARTS[k] starts a run of
+# characters that are _WIDTH_VALUES[k] columns wide. Built on first use.
+_WIDTH_STARTS = array("I")
+_WIDTH_VALUES = array("B")
+# Only these ranges have characters that are not 1 column wide
+_WIDTH_SEGMENTS = ((0, 0x40000), (0xE0000, 0xE1000))
+
+
+def _char_width(code):
+    char = chr(code)
+    category = unicodedata.category(char)
+    if (category in ("Mn", "Me") or (category == "Cf" and code != 0xAD)
+            or 0x1160 <= code <= 0x11FF):  # combining marks, format controls, Hangul jamo
+        return 0
+    if category == "Cn":  # unassigned: wide only in the planes reserved for ideographs
+        return 2 if 0x20000 <= code < 0x40000 else 1
+    return 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+
+
+def _build_width_table():
+    for start, end in _WIDTH_SEGMENTS:
+        for code in range(start, end):
+            width = _char_width(code)
+            if code == start or width != _WIDTH_VALUES[-1]:
+                _WIDTH_STARTS.append(code)
+                _WIDTH_VALUES.append(width)
+        _WIDTH_STARTS.append(end)
+        _WIDTH_VALUES.append(1)
+
+
+class _CharWidths(dict):
+    """Display width per character, looked up in the run table once per character."""
+
+    def __missing__(self, char):
+        if not _WIDTH_STARTS:
+            _build_width_table()
+        width = self[char] = _WIDTH_VALUES[bisect_right(_WIDTH_STARTS, ord(char)) - 1]
+        return width
+
+
+_CHAR_WIDTHS = _CharWidths()
+
+
+@lru_cache(maxsize=1 << 16)
+def _wide_word_width(word):
+    return sum(map(_CHAR_WIDTHS.__getitem__, word))
+
+
+def display_width(word):
+    """
+    Columns a word takes in a terminal: East Asian wide characters and emoji
+    take two, combining marks and zero-width characters none. ASCII words are
+    measured with len() and the others are memoized, as words repeat.
+    """
+    if word.isascii():
+        return len(word)
+    return _wide_word_width(word)
+
+
+MEASURES = {"chars": len, "display": display_width}
+
+
+def greedy_breaks(lengths, width):
+    """
+    Fill lines first-fit. Takes an iterable of word lengths and yields the
+    number of words on each line, as soon as each line is complete.
+    """
+    count = 0
+    line_length = 0
+    for length in lengths:
+        if count and line_length + 1 + length > width:
+            yield count
+            count = 0
+        line_length = length if count == 0 else line_length + 1 + length
+        count += 1
+    if count:
+        yield count
+
+
+def optimal_breaks(lengths, width):
+    """
+    Minimum-raggedness line breaking (Knuth-Plass without hyphenation):
+    minimizes the sum of squared trailing space over all lines but the last.
+    Yields line sizes like greedy_breaks, after reading the whole paragraph.
+
+    A line holding words i..j-1 costs f(i) + g(w), where w = offsets[j] -
+    offsets[i] + j - i - 1 is its natural width and g is convex, so the cost
+    matrix is Monge and the best previous break only moves forward. A queue
+    of candidate breaks, each owning the range of j it wins, with binary
+    search for where a new candidate takes over, gives O(n log n) instead of
+    trying every i for every j.
+    """
+    offsets = [0]
+    for length in lengths:
+        offsets.append(offsets[-1] + length)
+    n = len(offsets) - 1
+    if n == 0:
+        return
+    # Overfull lines (only unavoidable for words wider than the line) cost
+    # more per column than any amount of trailing space
+    overfull = (n + 1) * (width + 1) ** 2
+    best = [0] * (n + 1)
+    previous = [0] * (n + 1)
+
+    def cost(i, j):
+        w = offsets[j] - offsets[i] + j - i - 1
+        if w > width:
+            return best[i] + overfull * (w - width)
+        return best[i] + (width - w) ** 2
+
+    candidates = deque([(0, 1)])  # (break i, first j where i is the best)
+    for j in range(1, n + 1):
+        while len(candidates) > 1 and candidates[1][1] <= j:
+            candidates.popleft()
+        i = candidates[0][0]
+        best[j] = cost(i, j)
+        previous[j] = i
+        if j == n:
+            break
+        # j becomes a candidate; drop candidates it beats from where they start
+        while (candidates and candidates[-1][1] > j
+               and cost(j, candidates[-1][1]) <= cost(*candidates[-1])):
+            candidates.pop()
+        if not candidates:
+            candidates.append((j, j + 1))
+            continue
+        low, high = max(candidates[-1][1], j + 1), n + 1
+        last = candidates[-1][0]
+        while low < high:
+            mid = (low + high) // 2
+            if cost(j, mid) <= cost(last, mid):
+                high = mid
+            else:
+                low = mid + 1
+        if low <= n:
+            candidates.append((j, low))
+
+    # The last line is free as long as it fits
+    start = n - 1
+    for i in range(n - 2, -1, -1):
+        if offsets[n] - offsets[i] + n - i - 1 > width:
+            break
+        if best[i] <= best[start]:
+            start = i
+    breaks = [n]
+    j = start
+    while j > 0:
+        breaks.append(j)
+        j = previous[j]
+    breaks.append(0)
+    breaks.reverse()
+    for i, j in zip(breaks, breaks[1:]):
+        yield j - i
+
+
+def justify_line(words, width, length=None):
+    """Pad the gaps of one line so it is `width` wide; extra spaces go to the leftmost gaps."""
+    if length is None:
+        length = sum(map(len, words))
+    total_spaces = width - length
+    num_gaps = len(words) - 1
+
+    if num_gaps == 0:
+        return words[0] + " " * total_spaces
+
+    spaces, extra = divmod(total_spaces, num_gaps)
+    if extra == 0:
+        return (" " * spaces).join(words)
+    wide = " " * (spaces + 1)
+    return wide.join(words[:extra + 1]) + " " * spaces + (" " * spaces).join(words[extra + 1:])
+
+
+def justify_words(words, width, breaks=greedy_breaks, measure=len):
+    """
+    Justify an iterable of words, yielding one line at a time.
+
+    `measure` gives the width of a word (len, or display_width for text with
+    wide or combining characters) and `breaks` turns the stream of widths
+    into line sizes. Words are only held until their line is complete, so
+    with greedy_breaks memory is bounded by one line.
+    """
+    pending = deque()
+    lengths = deque()
+
+    def word_lengths():
+        for word in words:
+            pending.append(word)
+            lengths.append(measure(word))
+            yield lengths[-1]
+
+    for count in breaks(word_lengths(), width):
+        line = [pending.popleft() for _ in range(count)]
+        length = sum(lengths.popleft() for _ in range(count))
+        yield justify_line(line, width, length)
+
+
+BREAKERS = {"greedy": greedy_breaks, "optimal": optimal_breaks}
+
+
+def justify_text(text, width, breaks=greedy_breaks, measure=len):
+    return "\n".join(justify_words(text.split(), width, breaks, measure))
 
-    for word in words[1:]:
-        if len(current_line) + len(word) + 1 <= width:
-            current_line += " " + word
-        else:
-            lines.append(current_line)
-            current_line = word
 
-    lines.append(current_line)
+def _paragraph_words(first_line, lines):
+    yield from first_line.split()
+    for line in lines:
+        if not line.strip():
+            return
+        yield from line.split()
+
+
+def justify_stream(lines, width, breaks=greedy_breaks, measure=len):
+    """
+    Justify text read line by line. Paragraphs are separated by blank lines,
+    are justified one at a time and keep a blank line between them.
+    """
+    lines = iter(lines)
+    first = True
+    for line in lines:
+        if not line.strip():
+            continue
+        if not first:
+            yield ""
+        first = False
+        yield from justify_words(_paragraph_words(line, lines), width, breaks, measure)
+
 
-    justified_lines = []
+def justify_file(input_path, width, output_path=None, breaks=greedy_breaks, measure=len):
+    """
+    Justify a file of any size, writing each line as soon as it is ready.
+    Output files are written to a temporary file next to them and renamed
+    at the end, so the output may be the input file itself.
+    """
+    with open(input_path, "r", encoding="utf-8") as src:
+        if not output_path:
+            for line in justify_stream(src, width, breaks, measure):
+                sys.stdout.write(line + "\n")
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_path)),
+                                        suffix=".tmp")
+        try:
+            with open(fd, "w", encoding="utf-8") as out:
+                for line in justify_stream(src, width, breaks, measure):
+                    out.write(line + "\n")
+            if os.path.exists(output_path):
+                shutil.copymode(output_path, tmp_path)
+            else:
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(tmp_path, 0o666 & ~umask)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def split_paragraphs(text):
+    """The words of each blank-line separated paragraph of a text."""
+    lines = iter(text.splitlines())
     for line in lines:
-        words_in_line = line.split()
-        total_spaces = width - sum(len(word) for word in words_in_line)
-        num_gaps = len(words_in_line) - 1
+        if line.strip():
+            yield list(_paragraph_words(line, lines))
+
+
+class LayoutCache:
+    """
+    On-disk LRU cache of justified paragraphs, keyed by a hash of the line
+    breaking mode, the width measure, the width and the paragraph's words.
+    """
+
+    def __init__(self, path, size=CACHE_SIZE):
+        self.size = size
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS layouts (
+                key BLOB PRIMARY KEY,
+                lines TEXT NOT NULL,
+                used INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS layouts_used ON layouts (used);
+        """)
+        # Every lookup or store is stamped with a new tick; the lowest go first
+        self.tick = self.conn.execute("SELECT COALESCE(MAX(used), 0) FROM layouts").fetchone()[0] + 1
 
-        if num_gaps == 0:
-            justified_lines.append(words_in_line[0] + " " * total_spaces)
+    @staticmethod
+    def key(words, width, mode, measure):
+        digest = hashlib.blake2b(f"{mode}\0{measure}\0{width}\0".encode(), digest_size=16)
+        digest.update(" ".join(words).encode())
+        return digest.digest()
+
+    def get_many(self, keys):
+        """Cached layouts for the keys that have one, as {key: text}."""
+        found = {}
+        keys = list(keys)
+        for k in range(0, len(keys), 500):
+            chunk = keys[k:k + 500]
+            marks = ",".join("?" * len(chunk))
+            found.update(self.conn.execute(
+                f"SELECT key, lines FROM layouts WHERE key IN ({marks})", chunk))
+        with self.conn:
+            self.conn.executemany("UPDATE layouts SET used = ? WHERE key = ?",
+                                  ((self.tick, key) for key in found))
+        self.tick += 1
+        return found
+
+    def put_many(self, layouts):
+        """Store {key: text} and evict the least recently used beyond `size`."""
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO layouts VALUES (?, ?, ?)",
+                                  ((key, text, self.tick) for key, text in layouts.items()))
+            count = self.conn.execute("SELECT COUNT(*) FROM layouts").fetchone()[0]
+            if count > self.size:
+                self.conn.execute("""
+                    DELETE FROM layouts WHERE key IN
+                        (SELECT key FROM layouts ORDER BY used LIMIT ?)""", (count - self.size,))
+        self.tick += 1
+
+    def close(self):
+        self.conn.close()
+
+
+def _justify_paragraphs(task):
+    width, mode, measure, paragraphs = task
+    breaks, measure = BREAKERS[mode], MEASURES[measure]
+    return ["\n".join(justify_words(words, width, breaks, measure)) for words in paragraphs]
+
+
+def justify_documents(documents, width, mode="greedy", workers=None, cache_path=None,
+                      cache_size=CACHE_SIZE, measure="chars"):
+    """
+    Justify many texts, paragraph by paragraph, like justify_stream().
+    `mode` and `measure` name entries of BREAKERS and MEASURES. Returns the
+    justified texts in order.
+
+    Each distinct paragraph is laid out once. Paragraphs found in the cache
+    at `cache_path` are not laid out again, and the rest are spread over a
+    pool of `workers` processes (default: one per CPU) in batches.
+    """
+    if mode not in BREAKERS:
+        raise ValueError(f"unknown line breaking mode {mode!r}")
+    if measure not in MEASURES:
+        raise ValueError(f"unknown width measure {measure!r}")
+    documents = [[(LayoutCache.key(words, width, mode, measure), words)
+                  for words in split_paragraphs(text)]
+                 for text in documents]
+    todo = {key: words for document in documents for key, words in document}
+
+    cache = LayoutCache(cache_path, cache_size) if cache_path else None
+    try:
+        layouts = cache.get_many(todo) if cache else {}
+        missing = [key for key in todo if key not in layouts]
+        tasks = [(width, mode, measure, [todo[key] for key in missing[k:k + BATCH_SIZE]])
+                 for k in range(0, len(missing), BATCH_SIZE)]
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(tasks) <= 1:
+            results = map(_justify_paragraphs, tasks)
         else:
-            spaces_between_words = total_spaces // num_gaps
-            extra_spaces = total_spaces % num_gaps
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_justify_paragraphs, tasks))
+        fresh = dict(zip(missing, (text for batch in results for text in batch)))
+        if cache and fresh:
+            cache.put_many(fresh)
+    finally:
+        if cache:
+            cache.close()
+    layouts.update(fresh)
+    return ["\n\n".join(layouts[key] for key, _ in document) for document in documents]
 
-            justified_line = ""
-            for i, word in enumerate(words_in_line[:-1]):
-                justified_line += word + " " * (spaces_between_words + (1 if i < extra_spaces else 0))
 
-            justified_line += words_in_line[-1]
-            justified_lines.append(justified_line)
+def justify_files(paths, width, output_dir=None, mode="greedy", workers=None,
+                  cache_path=None, cache_size=CACHE_SIZE, measure="chars"):
+    """
+    Justify a batch of files with justify_documents(). Results are written to
+    files of the same name in `output_dir`, or returned when it is None.
+    Raises ValueError if two inputs would be written to the same file.
+    """
+    if output_dir is not None:
+        names = [os.path.basename(path) for path in paths]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"several inputs would be written to the same file in {output_dir}: "
+                             + ", ".join(duplicates))
+    texts = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            texts.append(f.read())
+    results = justify_documents(texts, width, mode, workers, cache_path, cache_size, measure)
+    if output_dir is None:
+        return results
+    os.makedirs(output_dir, exist_ok=True)
+    for path, text in zip(paths, results):
+        with open(os.path.join(output_dir, os.path.basename(path)), "w", encoding="utf-8") as f:
+            f.write(text + "\n" if text else "")
 
-    return '\n'.join(justified_lines)
 
 # Example usage:
-text = """Diamond is a solid form of carbon with its atoms arranged in a crystal structure known as diamond cubic. 
-It is metastable at standard temperature and pressure, converting to the chemically stable form graphite 
+EXAMPLE = """Diamond is a solid form of carbon with its atoms arranged in a crystal structure known as diamond cubic.
+It is metastable at standard temperature and pressure, converting to the chemically stable form graphite
 under those conditions but at a negligible rate."""
 
-width = int(input("Enter the width for the line: "))
 
-justified_text = justify_text(text, width)
-print(justified_text)
+LATIN = "etaoinshrdlucmfwypvbgkjqxz"
+# Latin, CJK, emoji and e + combining acute accent
+MIXED = list(LATIN) + list("日本語の文字列漢字かなカナ한국어") + ["😀", "🎉", "e\u0301"]
+
+
+def _synthetic_book(words=1_000_000, seed=0, alphabet=LATIN):
+    """Paragraphs of 30-300 words with English-like word lengths."""
+    rng = random.Random(seed)
+    sizes = (1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 7, 8, 9, 10, 12)
+    vocab = ["".join(rng.choices(alphabet, k=rng.choice(sizes)))
+             for _ in range(20000)]
+    lines = []
+    while words > 0:
+        n = min(words, rng.randint(30, 300))
+        words -= n
+        paragraph = rng.choices(vocab, k=n)
+        lines.extend(" ".join(paragraph[k:k + 12]) + "\n" for k in range(0, n, 12))
+        lines.append("\n")
+    return lines
+
+
+def _unicodedata_width(word):
+    """display_width() without the table, for comparison."""
+    return sum(_char_width(ord(char)) for char in word)
+
+
+def raggedness(lines, width):
+    """Sum of squared trailing space, not counting the last line of each paragraph."""
+    total = 0
+    for line, following in zip(lines, lines[1:] + [""]):
+        if line and following:
+            total += (width - len(" ".join(line.split()))) ** 2
+    return total
+
+
+def benchmark(path, width):
+    """Greedy vs optimal line breaking: throughput and raggedness."""
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.readlines()
+    else:
+        text = _synthetic_book()
+    words = sum(len(line.split()) for line in text)
+    print(f"{words} words, width {width}")
+    print(f"{'mode':10}{'seconds':>9}{'words/s':>12}{'raggedness':>14}")
+    for name, breaks in BREAKERS.items():
+        start = time.perf_counter()
+        lines = list(justify_stream(text, width, breaks))
+        seconds = time.perf_counter() - start
+        print(f"{name:10}{seconds:9.2f}{words / seconds:12.0f}{raggedness(lines, width):14}")
+
+    print("\nOne paragraph of n words (optimal):")
+    for n in (10_000, 100_000, 1_000_000):
+        paragraph = ["x" * (1 + i * 7919 % 9) for i in range(n)]
+        start = time.perf_counter()
+        sum(optimal_breaks(map(len, paragraph), width))
+        seconds = time.perf_counter() - start
+        print(f"  n={n:<9}{seconds:8.2f} s {n / seconds:12.0f} words/s")
+
+    print("\nWord width measures (greedy):")
+    mixed = _synthetic_book(words, alphabet=MIXED)
+    runs = [("ascii", text, "chars", len), ("ascii", text, "display", display_width),
+            ("mixed", mixed, "chars", len), ("mixed", mixed, "display", display_width),
+            ("mixed", mixed, "unicodedata", _unicodedata_width)]
+    for label, book, name, measure in runs:
+        start = time.perf_counter()
+        for _ in justify_stream(book, width, greedy_breaks, measure):
+            pass
+        seconds = time.perf_counter() - start
+        print(f"  {label:6}{name:12}{seconds:8.2f} s {words / seconds:12.0f} words/s")
+
+    documents = ["".join(text[k:k + 500]) for k in range(0, len(text), 500)]
+    print(f"\nBatch of {len(documents)} documents:")
+    runs = [("no cache, 1 process", 1, False), (f"no cache, pool of {os.cpu_count()}", None, False),
+            ("cold cache", None, True), ("warm cache", None, True)]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, CACHE_FILE)
+        for mode in BREAKERS:
+            for label, workers, cached in runs:
+                start = time.perf_counter()
+                justify_documents(documents, width, mode, workers,
+                                  cache_path if cached else None)
+                seconds = time.perf_counter() - start
+                print(f"  {mode:8}{label:22}{seconds:8.2f} s {words / seconds:12.0f} words/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Justify text to a fixed line width")
+    parser.add_argument("inputs", nargs="*", metavar="input",
+                        help="Text files to justify (default: an example text)")
+    parser.add_argument("-w", "--width", type=int, help="Line width (asked for when omitted)")
+    parser.add_argument("-o", "--output",
+                        help="Output file, or directory for several inputs (default: stdout)")
+    parser.add_argument("-m", "--mode", choices=BREAKERS, default="greedy",
+                        help="Line breaking: first-fit or minimum raggedness (default: greedy)")
+    parser.add_argument("--measure", choices=MEASURES, default="chars",
+                        help="Word width: characters, or terminal columns for CJK, emoji and "
+                             "combining marks (default: chars)")
+    parser.add_argument("-j", "--jobs", type=int,
+                        help="Worker processes for a batch of files (default: one per CPU)")
+    parser.add_argument("--cache", nargs="?", const=CACHE_FILE,
+                        help=f"Reuse justified paragraphs from this cache file (default: {CACHE_FILE})")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE,
+                        help=f"Paragraphs kept in the cache (default: {CACHE_SIZE})")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare greedy and optimal breaking on the input (default: a synthetic book)")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.inputs[0] if args.inputs else None, args.width or 72)
+        return
+    if len(args.inputs) > 1 and not args.output:
+        parser.error("several inputs need -o DIRECTORY")
+
+    width = args.width or int(input("Enter the width for the line: "))
+    breaks, measure = BREAKERS[args.mode], MEASURES[args.measure]
+
+    if len(args.inputs) > 1 or args.jobs or args.cache:
+        if len(args.inputs) > 1:
+            try:
+                justify_files(args.inputs, width, args.output, args.mode, args.jobs,
+                              args.cache, args.cache_size, args.measure)
+            except ValueError as e:
+                parser.error(str(e))
+            return
+        if args.inputs:
+            text, = justify_files(args.inputs, width, None, args.mode, args.jobs,
+                                  args.cache, args.cache_size, args.measure)
+        else:
+            text, = justify_documents([EXAMPLE], width, args.mode, args.jobs,
+                                      args.cache, args.cache_size, args.measure)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text + "\n" if text else "")
+        else:
+            print(text)
+    elif args.inputs:
+        justify_file(args.inputs[0], width, args.output, breaks, measure)
+    else:
+        print(justify_text(EXAMPLE, width, breaks, measure))
+
+
+if __name__ == "__main__":
+    main()